@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Non-interactive batch runner: research many topics in parallel and save each post as it completes
+
+Examples:
+    python examples/run_batch.py                          # every topic in sample_topics.py
+    python examples/run_batch.py --category science       # one sample category
+    python examples/run_batch.py --topics-file topics.txt --concurrency 5 --no-cartoons
+"""
+import argparse
+import asyncio
+import base64
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from galileo import galileo_context
+
+# Add the src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tim_urban_agent.agent import RESEARCH_MODES, TimUrbanResearchAgent
+from tim_urban_agent.utils.executor import cpu_executor
+from tim_urban_agent.utils.http_session import session_manager
+from sample_topics import SAMPLE_TOPICS
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate Tim Urban-style posts for many topics in parallel")
+    parser.add_argument("--topics-file", help="File with one topic per line (# starts a comment)")
+    parser.add_argument("--category", choices=sorted(SAMPLE_TOPICS), help="Only use this sample topic category")
+    parser.add_argument("--depth", type=int, default=3, choices=range(1, 6), help="Research depth (1-5)")
+    parser.add_argument("--style", default="humorous", choices=["humorous", "technical", "balanced"])
+    parser.add_argument("--mode", default="standard", choices=RESEARCH_MODES, help="Research mode")
+    parser.add_argument("--no-cartoons", action="store_true", help="Skip cartoon generation")
+    parser.add_argument("--time-budget", type=float, help="Seconds each topic must be answered within")
+    parser.add_argument("--concurrency", type=int, help="Topics researched at once (default: BATCH_CONCURRENCY)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results and regenerate")
+    parser.add_argument("--output-dir", default="output", help="Directory to write posts to")
+    return parser.parse_args()
+
+def load_topics(args) -> list:
+    """Read topics from a file, one sample category, or every sample topic"""
+    if args.topics_file:
+        with open(args.topics_file, 'r', encoding='utf-8') as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+        return [line for line in lines if line]
+    
+    if args.category:
+        return list(SAMPLE_TOPICS[args.category])
+    
+    return [topic for topics in SAMPLE_TOPICS.values() for topic in topics]
+
+def slugify(topic: str) -> str:
+    """Turn a topic into a safe file name stem"""
+    return re.sub(r"[^a-z0-9_]+", "", topic.replace(' ', '_').lower())
+
+def save_result(output_dir: Path, result: dict) -> Path:
+    """Write a blog post, its metadata and cartoons; returns the blog post path"""
+    slug = slugify(result["topic"])
+    
+    blog_path = output_dir / f"blog_post_{slug}.md"
+    with open(blog_path, 'w', encoding='utf-8') as f:
+        f.write(result["blog_post"])
+    
+    metadata = {
+        "topic": result["topic"],
+        "style": result["style"],
+        "generated_at": result["generated_at"],
+        "research_summary": result["research_summary"],
+        "sources": result["sources"],
+        "metrics": result.get("metrics", {})
+    }
+    with open(output_dir / f"metadata_{slug}.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    
+    for i, cartoon in enumerate(result.get("cartoons", [])):
+        with open(output_dir / f"cartoon_{i+1}_{slug}.png", 'wb') as f:
+            f.write(base64.b64decode(cartoon["data"]))
+    
+    return blog_path
+
+async def main():
+    """Run the batch and print throughput stats"""
+    args = parse_args()
+    topics = load_topics(args)
+    if not topics:
+        print("No topics to research.")
+        return
+    
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    agent = TimUrbanResearchAgent()
+    started = time.perf_counter()
+    succeeded = []
+    failures = []
+    
+    async def on_result(topic: str, result: dict):
+        elapsed = time.perf_counter() - started
+        done = len(succeeded) + len(failures) + 1
+        if "error" in result:
+            failures.append(topic)
+            print(f"[{done}/{len(topics)}] ❌ {topic}: {result['error']}")
+            return
+        
+        succeeded.append(topic)
+        blog_path = await asyncio.to_thread(save_result, output_dir, result)
+        cached = " (cached)" if result["metrics"].get("result_cache_hit") else ""
+        print(f"[{done}/{len(topics)}] ✅ {topic} -> {blog_path} at {elapsed:.1f}s{cached}")
+    
+    print(f"🔬 Researching {len(topics)} topics (depth {args.depth}, {args.style} style, {args.mode} mode)...\n")
+    
+    try:
+        with galileo_context(log_stream="research-batch-flow"):
+            await agent.research_many(
+                topics,
+                depth=args.depth,
+                style=args.style,
+                include_cartoons=not args.no_cartoons,
+                refresh=args.refresh,
+                max_concurrency=args.concurrency,
+                on_result=on_result,
+                mode=args.mode,
+                time_budget=args.time_budget
+            )
+    finally:
+        await session_manager.close()
+        cpu_executor.shutdown()
+    
+    elapsed = time.perf_counter() - started
+    print("\n" + "="*60)
+    print(f"📈 Batch complete in {elapsed:.1f}s")
+    print(f"  • Succeeded: {len(succeeded)}  Failed: {len(failures)}")
+    print(f"  • Throughput: {len(succeeded) / elapsed * 60:.1f} posts/minute")
+    if succeeded:
+        print(f"  • Wall time per post: {elapsed / len(succeeded):.1f}s")
+    for topic in failures:
+        print(f"  • Failed: {topic}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
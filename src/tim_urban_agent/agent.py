@@ -2,19 +2,38 @@
 Main Tim Urban Research Agent implementation
 """
 import asyncio
+import copy
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import time
+import uuid
+from typing import Dict, List, Any, Awaitable, Callable, Optional
 from datetime import datetime
 
+from .config import config
 from .tools.web_search_tool import WebSearchTool
 from .tools.youtube_tool import YouTubeTool  
 from .tools.image_generation_tool import ImageGenerationTool
 from .generators.blog_generator import BlogGenerator
+from .utils.checkpoint import CheckpointStore
+from .utils.circuit_breaker import breaker_metrics
+from .utils.deadline import Deadline
+from .utils.fetch_registry import FetchRegistry
+from .utils.novelty import AdaptiveGate
+from .utils.cache import DiskCache, TieredCache, TTLCache, normalize_query, stable_hash
+from .utils.pipeline import Pipeline
 from .utils.research_aggregator import ResearchAggregator
+from .utils.singleflight import SingleFlight
+from .utils.text_processor import TextProcessor
 from galileo import log, galileo_context
 
 logger = logging.getLogger(__name__)
 
+# "standard" gathers a fixed amount per depth level; "adaptive" treats depth as a ceiling
+# and stops fetching once new pages stop adding information; "fast" researches from search
+# snippets and video descriptions only and writes a short draft with simple cartoons
+RESEARCH_MODES = ("standard", "adaptive", "fast")
+
 class TimUrbanResearchAgent:
     """
     Main agent that orchestrates research and blog post generation
@@ -27,14 +46,44 @@ class TimUrbanResearchAgent:
         self.image_generator = ImageGenerationTool()
         self.blog_generator = BlogGenerator()
         self.research_aggregator = ResearchAggregator()
+        self._cartoon_semaphore = None
+        self._inflight = SingleFlight()
+
+        # Finished results, persisted across restarts
+        self.result_cache = DiskCache(
+            os.path.join(config.CACHE_DIR, "results"),
+            ttl=config.RESULT_CACHE_TTL,
+            max_bytes=config.RESULT_CACHE_MAX_BYTES
+        ) if config.RESULT_CACHE_ENABLED else None
+        
+        # Per-phase outputs, keyed only by the inputs each phase depends on
+        self.phase_cache = TieredCache(
+            TTLCache(max_entries=config.PHASE_CACHE_MAX_ENTRIES, ttl=config.PHASE_CACHE_TTL),
+            DiskCache(
+                os.path.join(config.CACHE_DIR, "phases"),
+                ttl=config.PHASE_CACHE_TTL,
+                max_bytes=config.PHASE_CACHE_MAX_BYTES
+            ) if config.PHASE_CACHE_PERSIST else None
+        ) if config.PHASE_CACHE_ENABLED else None
 
+        # Completed phases of unfinished jobs, so a failed job can resume
+        self.checkpoints = None
+        if config.CHECKPOINT_ENABLED:
+            self.checkpoints = CheckpointStore(os.path.join(config.CACHE_DIR, "checkpoints"))
+            self.checkpoints.prune(config.CHECKPOINT_TTL)
+    
     @log(span_type="entrypoint", name="tim_urban_research_agent")    
     async def research_topic(
         self,
         topic: str,
         depth: int = 3,
         style: str = "humorous",
-        include_cartoons: bool = True
+        include_cartoons: bool = True,
+        refresh: bool = False,
+        job_id: Optional[str] = None,
+        on_progress: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        mode: str = "standard",
+        time_budget: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Conduct comprehensive research on a topic and generate a Tim Urban-style blog post
@@ -44,33 +93,263 @@ class TimUrbanResearchAgent:
             depth: Research depth (1-5)
             style: Writing style preference
             include_cartoons: Whether to generate stick figure cartoons
+            refresh: Ignore any cached result and regenerate (the cache is still updated)
+            job_id: ID of a failed job to resume from its last completed phase;
+                a new ID is generated when omitted
+            on_progress: Async callback invoked with a phase name and "started" or "completed"
+            mode: Research mode, one of RESEARCH_MODES
+            time_budget: Seconds to answer within. Gathering shrinks, cartoons fall back
+                to simpler styles and slow phases are replaced by their fallbacks to
+                return the best result available in time
+            
+        Returns:
+            Dictionary containing the blog post, associated media and the job ID
+        """
+        if mode not in RESEARCH_MODES:
+            raise ValueError(f"Unknown research mode {mode!r}; expected one of {', '.join(RESEARCH_MODES)}")
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("time_budget must be positive")
+        
+        deadline = Deadline(time_budget)
+        cache_key = self._result_cache_key(topic, depth, style, include_cartoons, mode)
+        
+        if job_id is not None or on_progress is not None:
+            # A tracked job needs its own checkpoints and progress events, so it runs alone.
+            # Only a caller-supplied job ID can be resumed, so only those are checkpointed
+            return await self._cached_research(
+                cache_key, topic, depth, style, include_cartoons, refresh, job_id or uuid.uuid4().hex,
+                on_progress, mode, deadline, checkpoint=job_id is not None
+            )
+        
+        # Concurrent identical requests attach to the one already running (if it has the same budget)
+        return await self._inflight.do(
+            (cache_key, refresh, time_budget),
+            lambda: self._cached_research(
+                cache_key, topic, depth, style, include_cartoons, refresh, uuid.uuid4().hex, None, mode, deadline
+            )
+        )
+    
+    async def research_many(
+        self,
+        topics: List[str],
+        depth: int = 3,
+        style: str = "humorous",
+        include_cartoons: bool = True,
+        refresh: bool = False,
+        max_concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        mode: str = "standard",
+        time_budget: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Research several topics in parallel, sharing this agent's caches and connection pools
+        
+        Args:
+            topics: The topics to research
+            depth: Research depth (1-5)
+            style: Writing style preference
+            include_cartoons: Whether to generate stick figure cartoons
+            refresh: Ignore any cached results and regenerate
+            max_concurrency: Topics researched at once (defaults to BATCH_CONCURRENCY)
+            on_result: Async callback invoked with each topic and its result as soon as it completes
+            mode: Research mode, one of RESEARCH_MODES
+            time_budget: Seconds each topic must be answered within, once it starts
             
         Returns:
-            Dictionary containing the blog post and associated media
+            Results in the order of topics; a failed topic yields {"topic": ..., "error": ...}
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or config.BATCH_CONCURRENCY)
+        
+        async def run(topic: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await self.research_topic(
+                        topic,
+                        depth=depth,
+                        style=style,
+                        include_cartoons=include_cartoons,
+                        refresh=refresh,
+                        mode=mode,
+                        time_budget=time_budget
+                    )
+                except Exception as e:
+                    logger.error(f"Batch research failed for topic '{topic}': {e}")
+                    result = {"topic": topic, "error": str(e)}
+            
+            if on_result is not None:
+                await on_result(topic, result)
+            return result
+        
+        return await asyncio.gather(*(run(topic) for topic in topics))
+    
+    async def _cached_research(
+        self,
+        cache_key: str,
+        topic: str,
+        depth: int,
+        style: str,
+        include_cartoons: bool,
+        refresh: bool,
+        job_id: str,
+        on_progress: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        mode: str = "standard",
+        deadline: Optional[Deadline] = None,
+        checkpoint: bool = False
+    ) -> Dict[str, Any]:
+        """Serve a result from the result cache, or run the pipeline and cache it"""
+        if self.result_cache and not refresh:
+            cached_result = await asyncio.to_thread(self.result_cache.get, cache_key)
+            if cached_result is not None:
+                logger.info(f"Serving cached research for topic: {topic}")
+                cached_result["job_id"] = job_id
+                cached_result["metrics"]["result_cache_hit"] = True
+                return cached_result
+        
+        result = await self._run_research(
+            topic, depth, style, include_cartoons, job_id, on_progress, mode, deadline, refresh, checkpoint
+        )
+        
+        # Results cut short by a time budget or patched with fallbacks shouldn't be replayed
+        if self.result_cache and not result["metrics"]["degraded"]:
+            await asyncio.to_thread(self.result_cache.set, cache_key, result)
+        
+        return result
+    
+    @staticmethod
+    def _result_cache_key(
+        topic: str,
+        depth: int,
+        style: str,
+        include_cartoons: bool,
+        mode: str = "standard"
+    ) -> str:
+        """Build the result cache key from normalized arguments"""
+        return f"{normalize_query(topic)}|{depth}|{style.lower()}|{bool(include_cartoons)}|{mode}"
+    
+    async def _run_research(
+        self,
+        topic: str,
+        depth: int,
+        style: str,
+        include_cartoons: bool,
+        job_id: str,
+        on_progress: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        mode: str = "standard",
+        deadline: Optional[Deadline] = None,
+        refresh: bool = False,
+        checkpoint: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the full research and writing pipeline
+        
+        With checkpoint, each completed phase is checkpointed under job_id and a rerun
+        resumes from them. With refresh, memoized phase outputs are recomputed (and
+        re-cached) instead of reused.
         """
-        logger.info(f"Starting research on topic: {topic}")
+        logger.info(f"Starting {mode} research on topic: {topic} (job {job_id})")
+        
+        job = {"topic": topic, "depth": depth, "style": style, "include_cartoons": include_cartoons, "mode": mode}
+        completed = await self._load_checkpoints(job_id, job) if checkpoint else {}
+        draft = mode == "fast"
+        started_at = time.perf_counter()
+        deadline = deadline or Deadline()
+        degraded: List[str] = []
         
         try:
-            # Phase 1: Initial research gathering
-            research_data = await self._gather_research(topic, depth)
+            pipeline = Pipeline(**self._phase_callbacks(job_id, on_progress, checkpoint))
+            cache_hits: List[str] = []
+            
+            # Phase 1: Initial research gathering (depends on topic, depth and mode only)
+            pipeline.add_phase(
+                "research",
+                lambda: self._memoized(
+                    "research", f"{normalize_query(topic)}|{depth}|{mode}",
+                    lambda: self._gather_research(topic, depth, mode, deadline=deadline),
+                    cache_hits,
+                    cacheable=lambda research: bool(research["sources"]) and not research.get("degraded"),
+                    refresh=refresh
+                )
+            )
             
             # Phase 2: Aggregate and analyze research
-            analysis = await self.research_aggregator.analyze_research(research_data, topic)
+            pipeline.add_phase(
+                "analysis",
+                lambda research: self._memoized(
+                    "analysis", f"{stable_hash(research)}|{topic}",
+                    lambda: self.research_aggregator.analyze_research(research, topic),
+                    cache_hits,
+                    refresh=refresh
+                ),
+                depends_on=["research"]
+            )
             
             # Phase 3: Generate blog post structure
-            blog_structure = await self.blog_generator.create_structure(analysis, style)
+            pipeline.add_phase(
+                "structure",
+                lambda analysis: self._memoized(
+                    "structure", f"{stable_hash(analysis)}|{style}|{draft}",
+                    lambda: self._before_deadline(
+                        "structure",
+                        lambda: self.blog_generator.create_structure(analysis, style, draft=draft),
+                        deadline.timeout(config.DEADLINE_STRUCTURE_SHARE),
+                        lambda: self.blog_generator._fallback_structure(analysis),
+                        degraded
+                    ),
+                    cache_hits,
+                    refresh=refresh
+                ),
+                depends_on=["analysis"]
+            )
             
-            # Phase 4: Generate stick figure cartoons (if requested)
-            cartoons = []
+            # Phase 4: Generate stick figure cartoons (if requested), memoized per concept
             if include_cartoons:
-                cartoons = await self._generate_cartoons(blog_structure["cartoon_concepts"])
+                pipeline.add_phase(
+                    "cartoons",
+                    lambda structure: self._generate_cartoons(
+                        structure["cartoon_concepts"],
+                        cache_hits=cache_hits,
+                        style=self._cartoon_style(draft, deadline, degraded),
+                        timeout=deadline.timeout(),
+                        degraded=degraded,
+                        refresh=refresh
+                    ),
+                    depends_on=["structure"]
+                )
             
-            # Phase 5: Generate final blog post
-            blog_post = await self.blog_generator.generate_full_post(
-                blog_structure, analysis, cartoons, style
+            # Phase 5: Generate final blog post. It only needs the cartoon concepts
+            # for its markers, so it runs alongside image generation
+            pipeline.add_phase(
+                "blog_post",
+                lambda structure, analysis: self._before_deadline(
+                    "blog_post",
+                    lambda: self.blog_generator.generate_full_post(
+                        structure, analysis, self._planned_cartoons(structure, include_cartoons), style,
+                        draft=draft, on_fallback=lambda: degraded.append("blog_post_fallback")
+                    ),
+                    deadline.timeout(),
+                    lambda: self.blog_generator._fallback_blog_post(structure, analysis),
+                    degraded
+                ),
+                depends_on=["structure", "analysis"]
             )
             
+            results = await pipeline.run(completed)
+            research_data = results["research"]
+            analysis = results["analysis"]
+            blog_post = results["blog_post"]
+            cartoons = results.get("cartoons", [])
+            # A canned structure from a failed LLM call (timeouts already flagged theirs)
+            if results["structure"].get("fallback") and "structure_timeout" not in degraded:
+                degraded.append("structure_fallback")
+            latency = time.perf_counter() - started_at
+            latency_target = config.FAST_LATENCY_TARGET if draft else None
+            degraded = list(dict.fromkeys(research_data.get("degraded", []) + degraded))
+            
+            if checkpoint and self.checkpoints:
+                await asyncio.to_thread(self.checkpoints.clear, job_id)
+            
             return {
+                "job_id": job_id,
                 "blog_post": blog_post,
                 "cartoons": cartoons,
                 "research_summary": analysis["summary"],
@@ -82,53 +361,265 @@ class TimUrbanResearchAgent:
                     "word_count": len(blog_post.split()),
                     "source_count": len(research_data["sources"]),
                     "cartoon_count": len(cartoons),
-                    "research_depth": depth
+                    "research_depth": depth,
+                    "phase_timings": {
+                        name: round(timing["duration"], 3)
+                        for name, timing in pipeline.timings.items()
+                    },
+                    "critical_path": pipeline.critical_path(),
+                    "phase_cache_hits": cache_hits,
+                    "resumed_phases": pipeline.resumed,
+                    "research_mode": mode,
+                    "fetches_saved": research_data.get("fetch_stats", {}).get("saved", 0),
+                    "fetches_skipped": research_data.get("fetch_stats", {}).get("skipped", 0),
+                    "gathering": research_data.get("gathering"),
+                    "circuit_breakers": {
+                        provider: metrics["state"] for provider, metrics in breaker_metrics().items()
+                    },
+                    "latency_seconds": round(latency, 3),
+                    "latency_target": latency_target,
+                    "latency_target_met": latency <= latency_target if latency_target else None,
+                    "time_budget": deadline.time_budget,
+                    "deadline_met": not deadline.expired() if deadline.bounded else None,
+                    "degraded": degraded,
+                    "result_cache_hit": False
                 }
             }
             
         except Exception as e:
             logger.error(f"Research failed for topic '{topic}': {e}")
+            if checkpoint and self.checkpoints:
+                logger.info(f"Completed phases are checkpointed; resume with job_id={job_id}")
             raise
     
+    async def _load_checkpoints(self, job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Load a job's completed phases, discarding them if they belong to different arguments"""
+        if self.checkpoints is None:
+            return {}
+        
+        completed = await asyncio.to_thread(self.checkpoints.load, job_id)
+        saved_job = completed.pop("job", None)
+        if completed and saved_job != job:
+            logger.warning(f"Checkpoints for job {job_id} were made with different arguments; starting over")
+            completed = {}
+        
+        if completed:
+            logger.info(f"Resuming job {job_id} after phases: {', '.join(sorted(completed))}")
+        else:
+            await asyncio.to_thread(self.checkpoints.clear, job_id)
+            await asyncio.to_thread(self.checkpoints.save, job_id, "job", job)
+        return completed
+    
+    def _phase_callbacks(
+        self,
+        job_id: str,
+        on_progress: Optional[Callable[[str, str], Awaitable[None]]],
+        checkpoint: bool = True
+    ) -> Dict[str, Callable]:
+        """Build the pipeline callbacks that report progress and (optionally) checkpoint each completed phase"""
+        async def started(phase: str):
+            if on_progress is not None:
+                await on_progress(phase, "started")
+        
+        async def completed(phase: str, result: Any):
+            # Like _memoized, don't keep fallbacks: a resumed job should retry the LLM call
+            is_fallback = isinstance(result, dict) and result.get("fallback")
+            if checkpoint and self.checkpoints is not None and not is_fallback:
+                try:
+                    await asyncio.to_thread(self.checkpoints.save, job_id, phase, result)
+                except (OSError, TypeError, ValueError) as e:
+                    # A lost checkpoint only costs redoing the phase on resume
+                    logger.warning(f"Could not checkpoint phase '{phase}' of job {job_id}: {e}")
+            if on_progress is not None:
+                await on_progress(phase, "completed")
+        
+        return {"on_phase_start": started, "on_phase_complete": completed}
+    
+    async def _before_deadline(
+        self,
+        name: str,
+        compute: Callable[[], Awaitable[Any]],
+        timeout: Optional[float],
+        fallback: Callable[[], Any],
+        degraded: List[str]
+    ) -> Any:
+        """Run compute within timeout, substituting fallback() and flagging name if time runs out"""
+        if timeout is None:
+            return await compute()
+        try:
+            return await asyncio.wait_for(compute(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} ran out of time after {timeout:.1f}s; using its fallback")
+            degraded.append(f"{name}_timeout")
+            return fallback()
+    
+    def _cartoon_style(self, draft: bool, deadline: Deadline, degraded: List[str]) -> str:
+        """Pick the richest cartoon style that still fits in the remaining time"""
+        style = "simple" if draft else "detailed"
+        remaining = deadline.remaining()
+        if remaining < config.DEADLINE_SIMPLE_CARTOON_MIN_SECONDS:
+            style = "placeholder"
+        elif style == "detailed" and remaining < config.DEADLINE_DALLE_MIN_SECONDS:
+            style = "simple"
+        
+        if style != ("simple" if draft else "detailed"):
+            logger.info(f"{remaining:.1f}s left; drawing {style} cartoons")
+            degraded.append(f"cartoons_{style}")
+        return style
+    
+    async def _memoized(
+        self,
+        phase: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cache_hits: List[str],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        refresh: bool = False
+    ) -> Any:
+        """
+        Return a phase's cached output for key, or compute and cache it
+        
+        Fallback outputs (marked with "fallback") are never cached so a transient
+        upstream failure isn't replayed to later runs. With refresh the cached
+        output is ignored, but the fresh one still replaces it.
+        """
+        if self.phase_cache is None:
+            return await compute()
+        
+        cache_key = f"{phase}|{key}"
+        value = None if refresh else self.phase_cache.get(cache_key)
+        if value is not None:
+            cache_hits.append(phase)
+            # Callers own their copy; the memory tier keeps the original
+            return copy.deepcopy(value)
+        
+        value = await compute()
+        is_fallback = isinstance(value, dict) and value.get("fallback")
+        if not is_fallback and (cacheable is None or cacheable(value)):
+            self.phase_cache.set(cache_key, copy.deepcopy(value))
+        return value
+    
+    def _planned_cartoons(self, structure: Dict[str, Any], include_cartoons: bool) -> List[Dict]:
+        """Cartoon stubs (concepts only) for placing markers before the images exist"""
+        if not include_cartoons:
+            return []
+        return [{"concept": concept} for concept in structure["cartoon_concepts"]]
+    
     @log(span_type="tool", name="research_gathering")
-    async def _gather_research(self, topic: str, depth: int) -> Dict[str, Any]:
-        """Gather research from multiple sources"""
-        logger.info(f"Gathering research with depth level {depth}")
+    async def _gather_research(
+        self,
+        topic: str,
+        depth: int,
+        mode: str = "standard",
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Gather research from multiple sources
+        
+        In adaptive mode the depth's result counts are a ceiling: pages are fetched a
+        few at a time and fetching stops once new pages stop adding information or
+        the time or byte budget runs out. Fast mode downloads no pages or transcripts
+        and works from search snippets and video descriptions.
+        
+        Under a deadline, gathering gets DEADLINE_RESEARCH_SHARE of the remaining time:
+        new page fetches stop at three quarters of it and searches still running at
+        the end are dropped. With too little time for page fetches at all, it falls
+        back to snippets only.
+        """
+        logger.info(f"Gathering research with depth level {depth} ({mode} mode)")
         
         # Determine search parameters based on depth
         web_results_count = min(depth * 2, 10)
         youtube_results_count = min(depth, 5)
         
+        deadline = deadline or Deadline()
+        gather_time = deadline.timeout(config.DEADLINE_RESEARCH_SHARE)
+        degraded: List[str] = []
+        fetch_content = mode != "fast"
+        if fetch_content and gather_time is not None and gather_time < config.DEADLINE_MIN_FETCH_SECONDS:
+            logger.info(f"Only {gather_time:.1f}s for gathering; using search snippets only")
+            fetch_content = False
+            degraded.append("research_snippets_only")
+        
+        # Related queries return many of the same pages; fetch each one once per run
+        if mode == "adaptive":
+            fetch_time = config.ADAPTIVE_TIME_BUDGET
+            if gather_time is not None:
+                fetch_time = min(fetch_time, gather_time * 0.75) if fetch_time else gather_time * 0.75
+            registry = FetchRegistry(
+                AdaptiveGate(time_budget=fetch_time), concurrency=config.ADAPTIVE_FETCH_CONCURRENCY
+            )
+        elif gather_time is not None and fetch_content:
+            # A gate that never closes on novelty, only on time
+            registry = FetchRegistry(
+                AdaptiveGate(novelty_threshold=0, time_budget=gather_time * 0.75, byte_budget=0),
+                concurrency=config.WEB_FETCH_CONCURRENCY
+            )
+        else:
+            registry = FetchRegistry()
+        
         # Execute searches concurrently
         web_task = self.web_search.execute(
             query=topic, 
-            max_results=web_results_count
+            max_results=web_results_count,
+            registry=registry,
+            fetch_pages=fetch_content
         )
         
         youtube_task = self.youtube_tool.execute(
             query=topic,
-            max_videos=youtube_results_count  
+            max_videos=youtube_results_count,
+            fetch_transcripts=fetch_content
         )
         
         # Additional searches for related concepts
         related_searches = await self._generate_related_queries(topic)
         related_tasks = [
-            self.web_search.execute(query=query, max_results=2)
+            self.web_search.execute(query=query, max_results=2, registry=registry, fetch_pages=fetch_content)
             for query in related_searches[:depth]
         ]
         
         # Wait for all searches to complete
         web_results, youtube_results, *related_results = await asyncio.gather(
-            web_task, youtube_task, *related_tasks
+            self._before_deadline(
+                "research", lambda: web_task, gather_time,
+                lambda: {"query": topic, "articles": []}, degraded
+            ),
+            self._before_deadline(
+                "research", lambda: youtube_task, gather_time,
+                lambda: {"query": topic, "videos": []}, degraded
+            ),
+            *(
+                self._before_deadline(
+                    "research", lambda task=task: task, gather_time,
+                    lambda query=query: {"query": query, "articles": []}, degraded
+                )
+                for query, task in zip(related_searches, related_tasks)
+            )
         )
         
-        return {
+        if registry.saved:
+            logger.info(f"Skipped {registry.saved} duplicate page fetch(es) across queries")
+        
+        # Simulated results from a provider outage keep the run going but must never be cached
+        if web_results.get("fallback") or any(related.get("fallback") for related in related_results):
+            degraded.append("serpapi_fallback")
+        if youtube_results.get("fallback"):
+            degraded.append("youtube_fallback")
+        
+        research = {
             "primary_web": web_results,
             "youtube": youtube_results,
             "related": related_results,
             "sources": self._compile_sources(web_results, youtube_results, related_results),
+            "fetch_stats": registry.metrics(),
             "depth": depth
         }
+        if registry.gate is not None:
+            research["gathering"] = registry.gate.metrics()
+        if degraded:
+            research["degraded"] = list(dict.fromkeys(degraded))
+        return research
     
     # @log(span_type="tool", name="generate_related_queries")
     async def _generate_related_queries(self, topic: str) -> List[str]:
@@ -145,11 +636,23 @@ class TimUrbanResearchAgent:
     
     # @log(span_type="tool", name="compile_sources")
     def _compile_sources(self, web_results: Dict, youtube_results: Dict, related_results: List) -> List[Dict]:
-        """Compile all sources into a structured list"""
+        """Compile all sources into a structured list, listing each page once"""
         sources = []
+        seen = set()
+        
+        def is_new(url: str) -> bool:
+            if not url:
+                return True
+            key = TextProcessor.canonicalize_url(url)
+            if key in seen:
+                return False
+            seen.add(key)
+            return True
         
         # Add web sources
         for article in web_results.get("articles", []):
+            if not is_new(article.get("url", "")):
+                continue
             sources.append({
                 "type": "web",
                 "title": article.get("title", ""),
@@ -159,16 +662,20 @@ class TimUrbanResearchAgent:
         
         # Add YouTube sources  
         for video in youtube_results.get("videos", []):
+            if not is_new(video.get("url", "")):
+                continue
             sources.append({
                 "type": "youtube",
                 "title": video.get("title", ""),
                 "url": video.get("url", ""),
-                "transcript_preview": video.get("transcript", "")[:200] + "..."
+                "transcript_preview": (video.get("transcript") or video.get("description", ""))[:200] + "..."
             })
         
         # Add related sources
         for result_set in related_results:
             for article in result_set.get("articles", []):
+                if not is_new(article.get("url", "")):
+                    continue
                 sources.append({
                     "type": "related_web",
                     "title": article.get("title", ""),
@@ -179,23 +686,72 @@ class TimUrbanResearchAgent:
         return sources
     
     @log(span_type="llm", name="generate_cartoons")
-    async def _generate_cartoons(self, cartoon_concepts: List[str]) -> List[Dict]:
-        """Generate stick figure cartoons for the blog post"""
-        cartoons = []
+    async def _generate_cartoons(
+        self,
+        cartoon_concepts: List[str],
+        cache_hits: Optional[List[str]] = None,
+        style: str = "detailed",
+        timeout: Optional[float] = None,
+        degraded: Optional[List[str]] = None,
+        refresh: bool = False
+    ) -> List[Dict]:
+        """
+        Generate stick figure cartoons for the blog post
         
-        for concept in cartoon_concepts:
-            try:
-                cartoon_data = await self.image_generator.execute(
-                    concept=concept,
-                    # style="simple"
-                    style="detailed"
-                )
-                cartoons.append({
-                    "concept": concept,
-                    "data": cartoon_data["image_data"],
-                    "description": cartoon_data.get("description", concept)
-                })
-            except Exception as e:
-                logger.warning(f"Failed to generate cartoon for '{concept}': {e}")
+        "simple" renders locally, "detailed" uses DALL-E. A cartoon not ready within
+        timeout is replaced by a placeholder and flagged in degraded. With refresh,
+        memoized cartoons are redrawn.
+        """
+        if self._cartoon_semaphore is None:
+            self._cartoon_semaphore = asyncio.Semaphore(config.CARTOON_CONCURRENCY)
+        if cache_hits is None:
+            cache_hits = []
+        if degraded is None:
+            degraded = []
+        
+        async def draw(concept: str) -> Dict:
+            async with self._cartoon_semaphore:
+                return await self.image_generator.execute(concept=concept, style=style)
+        
+        async def generate(concept: str) -> Dict:
+            # Placeholders stand in for failures, so don't memoize them
+            cartoon_data = await self._before_deadline(
+                "cartoons",
+                lambda: self._memoized(
+                    "cartoon", f"{concept}|{style}",
+                    lambda: draw(concept),
+                    cache_hits,
+                    cacheable=lambda data: data.get("method") != "placeholder",
+                    refresh=refresh
+                ),
+                timeout,
+                lambda: None,
+                degraded
+            )
+            if cartoon_data is None:
+                # Out of time: a placeholder renders locally in milliseconds
+                cartoon_data = await self.image_generator.execute(concept=concept, style="placeholder")
+            elif cartoon_data.get("method") == "placeholder" and style != "placeholder":
+                # The image tool gave up on this one and drew a placeholder instead
+                degraded.append("cartoons_failed")
+            return {
+                "concept": concept,
+                "data": cartoon_data["image_data"],
+                "description": cartoon_data.get("description", concept)
+            }
+        
+        # Generate concurrently; failures are isolated per cartoon and order is preserved
+        results = await asyncio.gather(
+            *(generate(concept) for concept in cartoon_concepts),
+            return_exceptions=True
+        )
+        
+        cartoons = []
+        for concept, result in zip(cartoon_concepts, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to generate cartoon for '{concept}': {result}")
+                degraded.append("cartoons_failed")
+            else:
+                cartoons.append(result)
         
         return cartoons
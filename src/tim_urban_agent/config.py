@@ -24,17 +24,110 @@ class Config:
     # Agent Configuration
     MAX_RESEARCH_DEPTH: int = int(os.getenv("MAX_RESEARCH_DEPTH", "5"))
     MAX_YOUTUBE_VIDEOS: int = int(os.getenv("MAX_YOUTUBE_VIDEOS", "3"))
+    YOUTUBE_CONCURRENCY: int = int(os.getenv("YOUTUBE_CONCURRENCY", "5"))
+    YOUTUBE_CALL_TIMEOUT: float = float(os.getenv("YOUTUBE_CALL_TIMEOUT", "15"))
     MAX_WEB_ARTICLES: int = int(os.getenv("MAX_WEB_ARTICLES", "5"))
     BLOG_POST_MIN_LENGTH: int = int(os.getenv("BLOG_POST_MIN_LENGTH", "2000"))
     CARTOON_COUNT: int = int(os.getenv("CARTOON_COUNT", "3"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "3"))
+    
+    # Time budgets (time_budget on research_topic): phase shares and degradation thresholds
+    DEADLINE_RESEARCH_SHARE: float = float(os.getenv("DEADLINE_RESEARCH_SHARE", "0.4"))
+    DEADLINE_MIN_FETCH_SECONDS: float = float(os.getenv("DEADLINE_MIN_FETCH_SECONDS", "8"))
+    DEADLINE_STRUCTURE_SHARE: float = float(os.getenv("DEADLINE_STRUCTURE_SHARE", "0.3"))
+    DEADLINE_DALLE_MIN_SECONDS: float = float(os.getenv("DEADLINE_DALLE_MIN_SECONDS", "45"))
+    DEADLINE_SIMPLE_CARTOON_MIN_SECONDS: float = float(os.getenv("DEADLINE_SIMPLE_CARTOON_MIN_SECONDS", "3"))
+    
+    # Fast mode: snippet-only research and a short draft
+    FAST_LATENCY_TARGET: float = float(os.getenv("FAST_LATENCY_TARGET", "10"))
+    FAST_STRUCTURE_MAX_TOKENS: int = int(os.getenv("FAST_STRUCTURE_MAX_TOKENS", "600"))
+    FAST_POST_MAX_TOKENS: int = int(os.getenv("FAST_POST_MAX_TOKENS", "1200"))
+    
+    # Adaptive gathering: stop fetching once new pages stop adding information
+    ADAPTIVE_NOVELTY_THRESHOLD: float = float(os.getenv("ADAPTIVE_NOVELTY_THRESHOLD", "0.3"))
+    ADAPTIVE_NOVELTY_WINDOW: int = int(os.getenv("ADAPTIVE_NOVELTY_WINDOW", "3"))
+    ADAPTIVE_MIN_DOCUMENTS: int = int(os.getenv("ADAPTIVE_MIN_DOCUMENTS", "3"))
+    ADAPTIVE_TIME_BUDGET: float = float(os.getenv("ADAPTIVE_TIME_BUDGET", "20"))
+    ADAPTIVE_BYTE_BUDGET: int = int(os.getenv("ADAPTIVE_BYTE_BUDGET", "250000"))
+    ADAPTIVE_FETCH_CONCURRENCY: int = int(os.getenv("ADAPTIVE_FETCH_CONCURRENCY", "3"))
+    
+    # Admission control for research_topic calls
+    MAX_CONCURRENT_RESEARCH: int = int(os.getenv("MAX_CONCURRENT_RESEARCH", "4"))
+    RESEARCH_QUEUE_SIZE: int = int(os.getenv("RESEARCH_QUEUE_SIZE", "16"))
+    
+    # Job queue settings (submit_research / job_status / job_result)
+    JOB_QUEUE_PATH: Optional[str] = os.getenv("JOB_QUEUE_PATH")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    JOB_RETENTION: int = int(os.getenv("JOB_RETENTION", str(7 * 86400)))
+    
+    # Web fetching settings
+    WEB_FETCH_CONCURRENCY: int = int(os.getenv("WEB_FETCH_CONCURRENCY", "8"))
+    WEB_FETCH_PER_HOST_CONCURRENCY: int = int(os.getenv("WEB_FETCH_PER_HOST_CONCURRENCY", "2"))
+    WEB_FETCH_PER_HOST_RPM: int = int(os.getenv("WEB_FETCH_PER_HOST_RPM", "60"))
+    WEB_FETCH_MAX_TRACKED_HOSTS: int = int(os.getenv("WEB_FETCH_MAX_TRACKED_HOSTS", "1024"))
+    WEB_FETCH_MAX_ATTEMPTS: int = int(os.getenv("WEB_FETCH_MAX_ATTEMPTS", "3"))
+    WEB_FETCH_HEDGE_EXTRA: int = int(os.getenv("WEB_FETCH_HEDGE_EXTRA", "0"))
+    SERPAPI_TIMEOUT: float = float(os.getenv("SERPAPI_TIMEOUT", "15"))
+    ARTICLE_MAX_BYTES: int = int(os.getenv("ARTICLE_MAX_BYTES", str(1024 * 1024)))
+    ARTICLE_MAX_CHARS: int = int(os.getenv("ARTICLE_MAX_CHARS", "2000"))
+    HTML_PARSER: Optional[str] = os.getenv("HTML_PARSER")
+    
+    # Shared HTTP connection pool settings
+    HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", "100"))
+    HTTP_POOL_PER_HOST: int = int(os.getenv("HTTP_POOL_PER_HOST", "10"))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    
+    # CPU worker pool settings ("thread" or "process")
+    CPU_EXECUTOR_KIND: str = os.getenv("CPU_EXECUTOR_KIND", "thread")
+    CPU_EXECUTOR_WORKERS: int = int(os.getenv("CPU_EXECUTOR_WORKERS", "0"))
+    
+    # Cache settings
+    CACHE_DIR: str = os.getenv("CACHE_DIR", os.path.join("~", ".cache", "tim_urban_agent"))
+    PAGE_CACHE_ENABLED: bool = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+    PAGE_CACHE_TTL: int = int(os.getenv("PAGE_CACHE_TTL", "86400"))
+    PAGE_CACHE_MAX_BYTES: int = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "21600"))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024"))
+    SEARCH_CACHE_PERSIST: bool = os.getenv("SEARCH_CACHE_PERSIST", "false").lower() == "true"
+    SEARCH_CACHE_MAX_BYTES: int = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+    PHASE_CACHE_ENABLED: bool = os.getenv("PHASE_CACHE_ENABLED", "true").lower() == "true"
+    PHASE_CACHE_TTL: int = int(os.getenv("PHASE_CACHE_TTL", "86400"))
+    PHASE_CACHE_MAX_ENTRIES: int = int(os.getenv("PHASE_CACHE_MAX_ENTRIES", "128"))
+    PHASE_CACHE_PERSIST: bool = os.getenv("PHASE_CACHE_PERSIST", "false").lower() == "true"
+    PHASE_CACHE_MAX_BYTES: int = int(os.getenv("PHASE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", "86400"))
+    RESULT_CACHE_MAX_BYTES: int = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+    CHECKPOINT_ENABLED: bool = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+    CHECKPOINT_TTL: int = int(os.getenv("CHECKPOINT_TTL", str(7 * 86400)))
     
     # Image generation settings
     DALLE_MODEL: str = os.getenv("DALLE_MODEL", "dall-e-3")
     DALLE_SIZE: str = os.getenv("DALLE_SIZE", "1024x1024")
     DALLE_QUALITY: str = os.getenv("DALLE_QUALITY", "standard")
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "120"))
+    CARTOON_CONCURRENCY: int = int(os.getenv("CARTOON_CONCURRENCY", "3"))
+    OPENAI_MAX_ATTEMPTS: int = int(os.getenv("OPENAI_MAX_ATTEMPTS", "3"))
+    OPENAI_IMAGES_PER_MINUTE: int = int(os.getenv("OPENAI_IMAGES_PER_MINUTE", "5"))
     
     # Anthropic settings
     ANTHROPIC_MODEL: str = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022")
+    ANTHROPIC_TIMEOUT: float = float(os.getenv("ANTHROPIC_TIMEOUT", "120"))
+    ANTHROPIC_MAX_ATTEMPTS: int = int(os.getenv("ANTHROPIC_MAX_ATTEMPTS", "3"))
+    ANTHROPIC_RPM: int = int(os.getenv("ANTHROPIC_RPM", "50"))
+    ANTHROPIC_TPM: int = int(os.getenv("ANTHROPIC_TPM", "40000"))
+    
+    # Retry backoff settings for upstream API calls
+    RETRY_BASE_DELAY: float = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+    RETRY_MAX_DELAY: float = float(os.getenv("RETRY_MAX_DELAY", "20.0"))
+    
+    # Circuit breakers for upstream providers
+    BREAKER_FAILURE_THRESHOLD: float = float(os.getenv("BREAKER_FAILURE_THRESHOLD", "0.5"))
+    BREAKER_MIN_CALLS: int = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+    BREAKER_WINDOW: int = int(os.getenv("BREAKER_WINDOW", "20"))
+    BREAKER_RESET_TIMEOUT: float = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
     
     @classmethod
     def get_all_vars(cls) -> dict:
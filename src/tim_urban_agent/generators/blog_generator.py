@@ -2,29 +2,78 @@
 Blog post generator for creating Tim Urban-style content
 """
 import os
-from typing import Dict, List, Any
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
 from jinja2 import Environment, FileSystemLoader
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic, APIConnectionError, InternalServerError, RateLimitError
 import logging
 from galileo import log
 
 from ..config import config
+from ..utils.circuit_breaker import anthropic_breaker
+from ..utils.rate_limiter import anthropic_limiter, estimate_tokens, retry_after_from_error
+from ..utils.retry import retry_async
 
 logger = logging.getLogger(__name__)
 
+# Transient failures worth retrying; anything else goes straight to the fallback
+RETRYABLE_ERRORS = (asyncio.TimeoutError, APIConnectionError, InternalServerError, RateLimitError)
+
+# Failures that indicate an outage; rate limiting is handled by the limiter instead
+OUTAGE_ERRORS = (asyncio.TimeoutError, APIConnectionError, InternalServerError)
+
 class BlogGenerator:
     """Generates Tim Urban-style blog posts from research data"""
     
     def __init__(self):
-        self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        # Retries are handled by _create_message so they use our jittered backoff
+        self.anthropic = AsyncAnthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            timeout=config.ANTHROPIC_TIMEOUT,
+            max_retries=0
+        )
         
         # Set up templates
         template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
         self.template_env = Environment(loader=FileSystemLoader(template_dir))
     
+    async def _create_message(self, name: str, **kwargs) -> Any:
+        """Call the Anthropic messages API within the shared rate limits, with retries"""
+        prompt = kwargs.get("system", "") + "".join(str(m["content"]) for m in kwargs.get("messages", []))
+        # Reserve the worst case up front and refund the difference once usage is known
+        estimate = estimate_tokens(prompt) + kwargs.get("max_tokens", 0)
+        
+        async def call():
+            await anthropic_limiter.acquire(estimate)
+            try:
+                message = await asyncio.wait_for(
+                    self.anthropic.messages.create(**kwargs), config.ANTHROPIC_TIMEOUT
+                )
+            except RateLimitError as e:
+                anthropic_limiter.penalize(retry_after_from_error(e))
+                raise
+            
+            usage = getattr(message, "usage", None)
+            if usage is not None:
+                try:
+                    anthropic_limiter.settle(estimate, int(usage.input_tokens) + int(usage.output_tokens))
+                except (TypeError, ValueError):
+                    pass
+            return message
+        
+        # An open breaker raises CircuitOpen, which isn't retried, so callers fall back at once
+        return await retry_async(
+            lambda: anthropic_breaker.call(call, failure_types=OUTAGE_ERRORS),
+            attempts=config.ANTHROPIC_MAX_ATTEMPTS,
+            base_delay=config.RETRY_BASE_DELAY,
+            max_delay=config.RETRY_MAX_DELAY,
+            retry_on=RETRYABLE_ERRORS,
+            name=name
+        )
+    
     @log(span_type="llm", name="create_structure")
-    async def create_structure(self, analysis: Dict[str, Any], style: str) -> Dict[str, Any]:
-        """Create a structured outline for the blog post"""
+    async def create_structure(self, analysis: Dict[str, Any], style: str, draft: bool = False) -> Dict[str, Any]:
+        """Create a structured outline for the blog post (a shorter one for a quick draft)"""
         
         system_prompt = """You are Tim Urban from Wait But Why. Create a detailed blog post structure 
         that breaks down complex topics in your signature style: funny, engaging, and educational.
@@ -48,9 +97,10 @@ class BlogGenerator:
         """
         
         try:
-            message = self.anthropic.messages.create(
+            message = await self._create_message(
+                "create_structure",
                 model="claude-3-5-sonnet-20241022",
-                max_tokens=1500,
+                max_tokens=config.FAST_STRUCTURE_MAX_TOKENS if draft else 1500,
                 temperature=0.8,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_prompt}]
@@ -72,9 +122,16 @@ class BlogGenerator:
         structure: Dict[str, Any], 
         analysis: Dict[str, Any], 
         cartoons: List[Dict],
-        style: str
+        style: str,
+        draft: bool = False,
+        on_fallback: Optional[Callable[[], None]] = None
     ) -> str:
-        """Generate the complete blog post"""
+        """
+        Generate the complete blog post, or a short preview draft of it
+        
+        A failed LLM call returns a canned fallback post; on_fallback is called when
+        that happens so callers can tell the two apart.
+        """
         
         system_prompt = """You are Tim Urban from Wait But Why. Write a complete blog post in your 
         signature style: funny, engaging, deeply educational, with lots of analogies and thought experiments.
@@ -94,13 +151,16 @@ class BlogGenerator:
             structure=structure,
             analysis=analysis,
             cartoons=cartoons,
-            style=style
+            style=style,
+            # About 0.75 words per token, leaving room for headers and markers
+            target_length=f"about {config.FAST_POST_MAX_TOKENS * 2 // 3} words (a quick preview draft)" if draft else None
         )
         
         try:
-            message = self.anthropic.messages.create(
+            message = await self._create_message(
+                "generate_full_post",
                 model=config.ANTHROPIC_MODEL,
-                max_tokens=4000,
+                max_tokens=config.FAST_POST_MAX_TOKENS if draft else 4000,
                 temperature=0.7,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_prompt}]
@@ -115,6 +175,8 @@ class BlogGenerator:
             
         except Exception as e:
             logger.error(f"Failed to generate blog post: {e}")
+            if on_fallback is not None:
+                on_fallback()
             return self._fallback_blog_post(structure, analysis)
     
     def _parse_structure_response(self, response: str, analysis: Dict) -> Dict[str, Any]:
@@ -193,7 +255,8 @@ class BlogGenerator:
                 f"The future of {analysis['topic']}"
             ],
             "opening_hook": f"So you want to understand {analysis['topic']}...",
-            "closing_thoughts": "And that's the story of how everything connects."
+            "closing_thoughts": "And that's the story of how everything connects.",
+            "fallback": True
         }
     
     def _fallback_blog_post(self, structure: Dict, analysis: Dict) -> str:
@@ -23,10 +23,14 @@ from mcp.types import (
     EmbeddedResource,
 )
 
-from .agent import TimUrbanResearchAgent
-from .tools.web_search_tool import WebSearchTool
-from .tools.youtube_tool import YouTubeTool
-from .tools.image_generation_tool import ImageGenerationTool
+from .agent import RESEARCH_MODES, TimUrbanResearchAgent
+from .config import config
+from .utils.admission import AdmissionController
+from .utils.circuit_breaker import breaker_metrics
+from .utils.executor import cpu_executor
+from .utils.http_session import session_manager
+from .utils.job_queue import JobQueue, JobWorkerPool
+from .utils.rate_limiter import anthropic_limiter, openai_image_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -36,14 +40,85 @@ class TimUrbanMCPServer:
     def __init__(self):
         self.server = Server("tim-urban-research-agent")
         self.agent = TimUrbanResearchAgent()
+        self.admission = AdmissionController(config.MAX_CONCURRENT_RESEARCH, config.RESEARCH_QUEUE_SIZE)
+        
+        # Background jobs accepted by submit_research
+        self.job_queue = JobQueue(config.JOB_QUEUE_PATH or os.path.join(config.CACHE_DIR, "jobs.sqlite3"))
+        self.job_queue.prune(config.JOB_RETENTION)
+        self.job_workers = JobWorkerPool(
+            self.job_queue, self.agent, config.JOB_WORKERS, config.JOB_POLL_INTERVAL
+        )
+        
         self._setup_handlers()
     
+    @staticmethod
+    def _research_content(result: Dict[str, Any]) -> List:
+        """Render a research result as MCP content: the blog post followed by its cartoons"""
+        return [
+            TextContent(
+                type="text",
+                text=result["blog_post"]
+            )
+        ] + [
+            ImageContent(
+                type="image",
+                data=cartoon["data"],
+                mimeType="image/png"
+            ) for cartoon in result.get("cartoons", [])
+        ]
+    
     def _setup_handlers(self):
         """Set up MCP server handlers"""
         
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
             """List available tools"""
+            research_properties = {
+                "topic": {
+                    "type": "string",
+                    "description": "The topic to research (e.g., 'How Neural Networks Work', 'The Future of Space Travel')"
+                },
+                "depth": {
+                    "type": "integer", 
+                    "description": "Research depth level (1-5, default: 3)",
+                    "default": 3,
+                    "minimum": 1,
+                    "maximum": 5
+                },
+                "style": {
+                    "type": "string",
+                    "description": "Writing style preference",
+                    "enum": ["humorous", "technical", "balanced"],
+                    "default": "humorous"
+                },
+                "include_cartoons": {
+                    "type": "boolean",
+                    "description": "Whether to generate stick figure cartoons",
+                    "default": True
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the result cache and regenerate the post",
+                    "default": False
+                },
+                "mode": {
+                    "type": "string",
+                    "description": "standard gathers a fixed amount per depth level; adaptive stops fetching once new sources stop adding information; fast writes a quick draft from search snippets only",
+                    "enum": list(RESEARCH_MODES),
+                    "default": "standard"
+                },
+                "time_budget": {
+                    "type": "number",
+                    "description": "Seconds to answer within; slow phases degrade to simpler output to meet it",
+                    "exclusiveMinimum": 0
+                }
+            }
+            job_id_schema = {
+                "type": "object",
+                "properties": {"job_id": {"type": "string", "description": "ID returned by submit_research"}},
+                "required": ["job_id"]
+            }
+            
             return [
                 Tool(
                     name="research_topic",
@@ -51,32 +126,43 @@ class TimUrbanMCPServer:
                     inputSchema={
                         "type": "object",
                         "properties": {
-                            "topic": {
+                            **research_properties,
+                            "job_id": {
                                 "type": "string",
-                                "description": "The topic to research (e.g., 'How Neural Networks Work', 'The Future of Space Travel')"
-                            },
-                            "depth": {
-                                "type": "integer", 
-                                "description": "Research depth level (1-5, default: 3)",
-                                "default": 3,
-                                "minimum": 1,
-                                "maximum": 5
+                                "description": "Resume a failed job from its last completed phase"
                             },
-                            "style": {
+                            "client_id": {
                                 "type": "string",
-                                "description": "Writing style preference",
-                                "enum": ["humorous", "technical", "balanced"],
-                                "default": "humorous"
-                            },
-                            "include_cartoons": {
-                                "type": "boolean",
-                                "description": "Whether to generate stick figure cartoons",
-                                "default": True
+                                "description": "Caller identity used to share capacity fairly under load"
                             }
                         },
                         "required": ["topic"]
                     }
                 ),
+                Tool(
+                    name="submit_research",
+                    description="Queue a research_topic job and return its job_id immediately; poll job_status and fetch job_result",
+                    inputSchema={
+                        "type": "object",
+                        "properties": research_properties,
+                        "required": ["topic"]
+                    }
+                ),
+                Tool(
+                    name="job_status",
+                    description="Get a queued research job's status, current phase and elapsed time",
+                    inputSchema=job_id_schema
+                ),
+                Tool(
+                    name="job_result",
+                    description="Get the blog post and cartoons of a completed research job",
+                    inputSchema=job_id_schema
+                ),
+                Tool(
+                    name="server_metrics",
+                    description="Report load metrics: research admission, article fetches, circuit breakers, provider rate limits and CPU stage timings",
+                    inputSchema={"type": "object", "properties": {}}
+                ),
                 Tool(
                     name="web_search",
                     description="Search the web for articles and information",
@@ -124,39 +210,69 @@ class TimUrbanMCPServer:
     
                 with galileo_context(log_stream=galileo_log_stream):
                     if name == "research_topic":
-                        result = await self.agent.research_topic(**arguments)
+                        params = {key: value for key, value in arguments.items() if key != "client_id"}
+                        async with self.admission.admit(arguments.get("client_id", "default")):
+                            result = await self.agent.research_topic(**params)
+                        return CallToolResult(content=self._research_content(result))
+                    
+                    elif name == "submit_research":
+                        params = {key: value for key, value in arguments.items() if key not in ("job_id", "client_id")}
+                        job_id = await asyncio.to_thread(self.job_queue.submit, params)
+                        self.job_workers.notify()
                         return CallToolResult(
-                            content=[
-                                TextContent(
-                                    type="text",
-                                    text=result["blog_post"]
-                                )
-                            ] + [
-                                ImageContent(
-                                    type="image",
-                                    data=cartoon["data"],
-                                    mimeType="image/png"
-                                ) for cartoon in result.get("cartoons", [])
-                            ]
+                            content=[TextContent(
+                                type="text",
+                                text=json.dumps({"job_id": job_id, "status": JobQueue.QUEUED}, indent=2)
+                            )]
+                        )
+                    
+                    elif name == "job_status":
+                        status = await asyncio.to_thread(self.job_queue.status, arguments["job_id"])
+                        if status is None:
+                            raise ValueError(f"Unknown job: {arguments['job_id']}")
+                        return CallToolResult(
+                            content=[TextContent(type="text", text=json.dumps(status, indent=2))]
+                        )
+                    
+                    elif name == "job_result":
+                        result = await asyncio.to_thread(self.job_queue.result, arguments["job_id"])
+                        if result is None:
+                            status = await asyncio.to_thread(self.job_queue.status, arguments["job_id"])
+                            if status is None:
+                                raise ValueError(f"Unknown job: {arguments['job_id']}")
+                            detail = f": {status['error']}" if status["error"] else ""
+                            raise ValueError(f"Job {arguments['job_id']} is {status['status']}{detail}")
+                        return CallToolResult(content=self._research_content(result))
+                    
+                    elif name == "server_metrics":
+                        metrics = {
+                            "admission": self.admission.metrics(),
+                            "web_fetch": self.agent.web_search.fetch_stats,
+                            "circuit_breakers": breaker_metrics(),
+                            "rate_limits": {
+                                limiter.name: limiter.metrics()
+                                for limiter in (anthropic_limiter, openai_image_limiter)
+                            },
+                            "cpu_stages": cpu_executor.get_timings()
+                        }
+                        return CallToolResult(
+                            content=[TextContent(type="text", text=json.dumps(metrics, indent=2))]
                         )
                 
                     elif name == "web_search":
-                        web_tool = WebSearchTool()
-                        results = await web_tool.execute(**arguments)
+                        results = await self.agent.web_search.execute(**arguments)
                         return CallToolResult(
                             content=[TextContent(type="text", text=json.dumps(results, indent=2))]
                         )
                     
                     elif name == "youtube_search":
-                        youtube_tool = YouTubeTool()
-                        results = await youtube_tool.execute(**arguments)
+                        results = await self.agent.youtube_tool.execute(**arguments)
                         return CallToolResult(
                             content=[TextContent(type="text", text=json.dumps(results, indent=2))]
                         )
                     
                     elif name == "generate_cartoon":
-                        image_tool = ImageGenerationTool()
-                        result = await image_tool.execute(**arguments)
+                        result = await self.agent.image_generator.execute(**arguments)
                         return CallToolResult(
                             content=[
                                 ImageContent(
@@ -180,20 +296,26 @@ class TimUrbanMCPServer:
 async def main():
     """Main entry point for the MCP server"""
     server_instance = TimUrbanMCPServer()
+    server_instance.job_workers.start()
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server_instance.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="tim-urban-research-agent",
-                server_version="0.1.0",
-                capabilities=server_instance.server.get_capabilities(
-                    notification_options=None,
-                    experimental_capabilities=None,
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server_instance.server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="tim-urban-research-agent",
+                    server_version="0.1.0",
+                    capabilities=server_instance.server.get_capabilities(
+                        notification_options=None,
+                        experimental_capabilities=None,
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await server_instance.job_workers.stop()
+        await session_manager.close()
+        cpu_executor.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -2,25 +2,45 @@
 Image generation tool for creating Tim Urban-style stick figure cartoons
 """
 import os
+import asyncio
 import base64
 import io
 from typing import Dict, Any
-from openai import OpenAI
-import matplotlib.pyplot as plt
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+from matplotlib.figure import Figure
 import matplotlib.patches as patches
 from matplotlib.patches import Circle, FancyBboxPatch
 import numpy as np
 import logging
 from galileo import log
 
+from ..config import config
+from ..utils.circuit_breaker import openai_breaker
+from ..utils.executor import cpu_executor
+from ..utils.rate_limiter import openai_image_limiter, retry_after_from_error
+from ..utils.retry import retry_async
+from ..utils.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Transient failures worth retrying before falling back to a placeholder
+RETRYABLE_ERRORS = (asyncio.TimeoutError, APIConnectionError, InternalServerError, RateLimitError)
+
+# Failures that indicate an outage; rate limiting is handled by the limiter instead
+OUTAGE_ERRORS = (asyncio.TimeoutError, APIConnectionError, InternalServerError)
+
 class ImageGenerationTool:
     """Tool for generating Tim Urban-style stick figure cartoons"""
     
     def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Retries go through _generate_dalle_cartoon so they respect the shared rate limit
+        self.openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=config.OPENAI_TIMEOUT,
+            max_retries=0
+        )
         self.dalle_model = os.getenv("DALLE_MODEL", "dall-e-3")
+        self._inflight = SingleFlight()
     
     @log(span_type="tool", name="generate_image")
     async def execute(self, concept: str, style: str = "simple") -> Dict[str, Any]:
@@ -29,16 +49,25 @@ class ImageGenerationTool:
         
         Args:
             concept: The concept to illustrate
-            style: Style preference ("simple" or "detailed")
+            style: Style preference ("simple", "detailed" or "placeholder")
             
         Returns:
             Dictionary containing image data and metadata
         """
+        # Identical concurrent cartoon requests share one generation
+        return await self._inflight.do((concept, style), lambda: self._generate(concept, style))
+    
+    async def _generate(self, concept: str, style: str) -> Dict[str, Any]:
+        """Generate the cartoon, falling back to a placeholder on failure"""
         try:
             if style == "simple":
                 # Generate using matplotlib for simple stick figures
                 image_data = await self._generate_simple_cartoon(concept)
                 method = "matplotlib"
+            elif style == "placeholder":
+                # Callers out of time ask for the placeholder directly
+                image_data = await self._generate_placeholder_cartoon(concept)
+                method = "placeholder"
             else:
                 # Generate using DALL-E for more detailed cartoons
                 image_data = await self._generate_dalle_cartoon(concept)
@@ -67,7 +96,14 @@ class ImageGenerationTool:
     
     async def _generate_simple_cartoon(self, concept: str) -> str:
         """Generate a simple stick figure cartoon using matplotlib"""
-        fig, ax = plt.subplots(1, 1, figsize=(8, 6))
+        return await cpu_executor.run("cartoon_render", ImageGenerationTool._render_simple_cartoon, concept)
+    
+    @staticmethod
+    def _render_simple_cartoon(concept: str) -> str:
+        """Render a simple stick figure cartoon to base64 PNG (runs on the worker pool)"""
+        # Use the object-oriented API: pyplot's global state isn't thread-safe
+        fig = Figure(figsize=(8, 6))
+        ax = fig.subplots(1, 1)
         ax.set_xlim(0, 10)
         ax.set_ylim(0, 8)
         ax.set_aspect('equal')
@@ -76,10 +112,10 @@ class ImageGenerationTool:
         ax.axis('off')
         
         # Draw stick figure
-        self._draw_stick_figure(ax, 3, 2, scale=1.0)
+        ImageGenerationTool._draw_stick_figure(ax, 3, 2, scale=1.0)
         
         # Add thought bubble with concept
-        self._draw_thought_bubble(ax, 6, 5, concept)
+        ImageGenerationTool._draw_thought_bubble(ax, 6, 5, concept)
         
         # Add title
         ax.text(5, 7.5, f"Understanding: {concept}", 
@@ -87,14 +123,14 @@ class ImageGenerationTool:
         
         # Convert to base64
         buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
         buf.seek(0)
         image_data = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close(fig)
         
         return image_data
     
-    def _draw_stick_figure(self, ax, x, y, scale=1.0):
+    @staticmethod
+    def _draw_stick_figure(ax, x, y, scale=1.0):
         """Draw a simple stick figure"""
         s = scale
         
@@ -122,7 +158,8 @@ class ImageGenerationTool:
         smile_y = y + 1.3*s + 0.15*s * np.sin(theta)
         ax.plot(smile_x, smile_y, 'k-', linewidth=1)
     
-    def _draw_thought_bubble(self, ax, x, y, text):
+    @staticmethod
+    def _draw_thought_bubble(ax, x, y, text):
         """Draw a thought bubble with text"""
         # Main bubble
         bubble = FancyBboxPatch(
@@ -166,20 +203,46 @@ class ImageGenerationTool:
         - Educational but funny
         """
         
-        response = self.openai_client.images.generate(
-            model=self.dalle_model,
-            prompt=prompt,
-            size="1024x1024",
-            quality="standard",
-            response_format="b64_json",
-            n=1
+        async def call():
+            await openai_image_limiter.acquire()
+            try:
+                return await asyncio.wait_for(
+                    self.openai_client.images.generate(
+                        model=self.dalle_model,
+                        prompt=prompt,
+                        size="1024x1024",
+                        quality="standard",
+                        response_format="b64_json",
+                        n=1
+                    ),
+                    config.OPENAI_TIMEOUT
+                )
+            except RateLimitError as e:
+                openai_image_limiter.penalize(retry_after_from_error(e))
+                raise
+        
+        response = await retry_async(
+            lambda: openai_breaker.call(call, failure_types=OUTAGE_ERRORS),
+            attempts=config.OPENAI_MAX_ATTEMPTS,
+            base_delay=config.RETRY_BASE_DELAY,
+            max_delay=config.RETRY_MAX_DELAY,
+            retry_on=RETRYABLE_ERRORS,
+            name="generate_dalle_cartoon"
         )
         
         return response.data[0].b64_json
     
     async def _generate_placeholder_cartoon(self, concept: str) -> str:
         """Generate a simple placeholder cartoon when other methods fail"""
-        fig, ax = plt.subplots(1, 1, figsize=(6, 4))
+        return await cpu_executor.run(
+            "cartoon_render", ImageGenerationTool._render_placeholder_cartoon, concept
+        )
+    
+    @staticmethod
+    def _render_placeholder_cartoon(concept: str) -> str:
+        """Render a placeholder cartoon to base64 PNG (runs on the worker pool)"""
+        fig = Figure(figsize=(6, 4))
+        ax = fig.subplots(1, 1)
         ax.set_xlim(0, 10)
         ax.set_ylim(0, 6)
         ax.axis('off')
@@ -192,9 +255,8 @@ class ImageGenerationTool:
         ax.text(5, 2, "🤔", ha='center', va='center', fontsize=24)
         
         buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
+        fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
         buf.seek(0)
         image_data = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close(fig)
         
         return image_data
@@ -4,71 +4,274 @@ Web search tool for gathering articles and information
 import os
 import aiohttp
 import asyncio
-from typing import Dict, List, Any
-from bs4 import BeautifulSoup
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Any, Optional
+from urllib.parse import urlparse
 import logging
 from galileo import log
 
+from ..config import config
+from ..utils.article_extractor import ArticleExtractor
+from ..utils.cache import DiskCache, TieredCache, TTLCache, normalize_query
+from ..utils.circuit_breaker import serpapi_breaker
+from ..utils.executor import cpu_executor
+from ..utils.fetch_registry import FetchRegistry
+from ..utils.http_session import session_manager
+from ..utils.rate_limiter import RateLimiter, parse_retry_after
+from ..utils.retry import backoff_delay
+from ..utils.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Responses that mean "slow down and try again" rather than "no content here"
+THROTTLE_STATUSES = (429, 503)
+
+class FetchThrottled(Exception):
+    """A host asked us to back off (429/503)"""
+    
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+class _HostState:
+    """A host's fetch slots and request budget, and how many fetches are using them"""
+    
+    def __init__(self, host: str):
+        self.semaphore = asyncio.Semaphore(config.WEB_FETCH_PER_HOST_CONCURRENCY)
+        self.limiter = RateLimiter(host, config.WEB_FETCH_PER_HOST_RPM)
+        self.active = 0
+
 class WebSearchTool:
     """Tool for searching the web and extracting article content"""
     
     def __init__(self):
         self.serp_api_key = os.getenv("SERP_API_KEY")
-        self.session = None
+        self._fetch_semaphore = None
+        self._hosts: "OrderedDict[str, _HostState]" = OrderedDict()
+        self.fetch_stats = {"fetched": 0, "throttled": 0, "retried": 0, "dropped": 0, "cancelled": 0}
+        self.extractor = ArticleExtractor()
+        self._inflight = SingleFlight()
+        self._search_inflight = SingleFlight()
+        
+        # On-disk cache of extracted article text, keyed by URL
+        self.page_cache = DiskCache(
+            os.path.join(config.CACHE_DIR, "pages"),
+            ttl=config.PAGE_CACHE_TTL,
+            max_bytes=config.PAGE_CACHE_MAX_BYTES
+        ) if config.PAGE_CACHE_ENABLED else None
+        
+        # SerpAPI results, in memory with an optional on-disk tier
+        self.search_cache = TieredCache(
+            TTLCache(max_entries=config.SEARCH_CACHE_MAX_ENTRIES, ttl=config.SEARCH_CACHE_TTL),
+            DiskCache(
+                os.path.join(config.CACHE_DIR, "search"),
+                ttl=config.SEARCH_CACHE_TTL,
+                max_bytes=config.SEARCH_CACHE_MAX_BYTES
+            ) if config.SEARCH_CACHE_PERSIST else None
+        )
     
-    async def _get_session(self):
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
+    async def _get_session(self) -> aiohttp.ClientSession:
+        return await session_manager.get_session()
     
     @log(span_type="tool", name="execute_web_search")
-    async def execute(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+    async def execute(
+        self,
+        query: str,
+        max_results: int = 5,
+        registry: Optional[FetchRegistry] = None,
+        fetch_pages: bool = True
+    ) -> Dict[str, Any]:
         """
         Search the web for articles related to the query
         
         Args:
             query: Search query string
             max_results: Maximum number of results to return
+            registry: Fetch registry shared by the run's other searches, so pages
+                they already fetched aren't fetched again
+            fetch_pages: Download and extract each result's page; when False the
+                articles carry only their search snippets
             
         Returns:
             Dictionary containing search results and extracted content
         """
+        if registry is not None:
+            # A run's pages go through its own registry and gate, so only the
+            # SerpAPI call is shared with other runs (see _search_web)
+            return await self._search_and_extract(query, max_results, registry, fetch_pages)
+        
+        # Identical concurrent searches share one run
+        return await self._inflight.do(
+            (normalize_query(query), max_results, fetch_pages),
+            lambda: self._search_and_extract(query, max_results, registry, fetch_pages)
+        )
+    
+    async def _search_and_extract(
+        self,
+        query: str,
+        max_results: int,
+        registry: Optional[FetchRegistry] = None,
+        fetch_pages: bool = True
+    ) -> Dict[str, Any]:
+        """Run the search and extract the content of each result"""
+        def fetch(url: str) -> Awaitable[str]:
+            if registry is None:
+                return self._fetch_with_limits(url)
+            return registry.fetch(url, self._fetch_with_limits)
+        
         try:
-            # Search using SerpAPI (or fallback to direct search)
-            search_results = await self._search_web(query, max_results)
+            # Search using SerpAPI (or fallback to direct search). When hedging, ask for
+            # spare candidates so slow or empty pages don't cost us articles
+            hedge_extra = config.WEB_FETCH_HEDGE_EXTRA if fetch_pages else 0
+            search_results = await self._search_web(query, max_results + hedge_extra)
+            # Simulated stand-ins for a failed SerpAPI call must not be mistaken for real results,
+            # and their made-up URLs aren't worth fetching
+            fallback = any(result.get("fallback") for result in search_results)
+            
+            if not fetch_pages or fallback:
+                articles = [
+                    {
+                        "title": result["title"],
+                        "url": result["url"],
+                        "snippet": result["snippet"],
+                        "content": "",
+                        "word_count": len(result["snippet"].split())
+                    }
+                    for result in search_results[:max_results]
+                ]
+                return {"query": query, "articles": articles, "total_found": len(articles), "fallback": fallback}
+            
+            urls = [result["url"] for result in search_results]
+            
+            # Extract content from all results concurrently, keeping search-rank order
+            if hedge_extra:
+                contents = await self._fetch_first(urls, max_results, fetch)
+            else:
+                contents = await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
             
-            # Extract content from each result
             articles = []
-            for result in search_results:
-                article_content = await self._extract_article_content(result["url"])
+            for result, article_content in zip(search_results, contents):
+                if len(articles) >= max_results:
+                    break
+                if isinstance(article_content, Exception):
+                    logger.warning(f"Failed to extract content from {result['url']}: {article_content}")
+                    continue
                 if article_content:
                     articles.append({
                         "title": result["title"],
                         "url": result["url"],
                         "snippet": result["snippet"],
-                        "content": article_content[:2000],  # Limit content length
+                        "content": article_content[:config.ARTICLE_MAX_CHARS],  # Limit content length
                         "word_count": len(article_content.split())
                     })
             
             return {
                 "query": query,
                 "articles": articles,
-                "total_found": len(articles)
+                "total_found": len(articles),
+                "fallback": fallback
             }
             
         except Exception as e:
             logger.error(f"Web search failed: {e}")
             return {"query": query, "articles": [], "error": str(e)}
     
+    async def _fetch_first(
+        self,
+        urls: List[str],
+        wanted: int,
+        fetch: Callable[[str], Awaitable[str]]
+    ) -> List[str]:
+        """
+        Fetch candidate URLs concurrently and stop once enough of them have content
+        
+        Args:
+            urls: Candidate URLs in search-rank order
+            wanted: Number of non-empty pages to wait for
+            fetch: Coroutine function that fetches a URL's content
+            
+        Returns:
+            Contents aligned with urls; failed, empty and cancelled candidates map to ""
+        """
+        tasks = [asyncio.ensure_future(fetch(url)) for url in urls]
+        index = {task: i for i, task in enumerate(tasks)}
+        contents = [""] * len(urls)
+        pending = set(tasks)
+        found = 0
+        
+        try:
+            while pending and found < wanted:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        logger.warning(f"Failed to extract content from {urls[index[task]]}: {task.exception()}")
+                        continue
+                    if task.result():
+                        contents[index[task]] = task.result()
+                        found += 1
+        finally:
+            # The stragglers would only set our latency; stop waiting for them
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.fetch_stats["cancelled"] += len(pending)
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        if found < wanted:
+            logger.info(f"Only {found} of {wanted} wanted articles had content after {len(urls)} candidates")
+        return contents
+    
     @log(span_type="tool", name="search_web")
     async def _search_web(self, query: str, max_results: int) -> List[Dict]:
-        """Perform web search using SerpAPI"""
+        """Perform web search using SerpAPI, sharing identical concurrent searches"""
+        return await self._search_inflight.do(
+            self._search_cache_key(query, max_results),
+            lambda: self._search_serpapi(query, max_results)
+        )
+    
+    async def _search_serpapi(self, query: str, max_results: int) -> List[Dict]:
+        """Get search results from the cache or SerpAPI, falling back to simulated ones"""
         if not self.serp_api_key:
             # Fallback to a simple search simulation
             return self._simulate_search_results(query, max_results)
         
+        cache_key = self._search_cache_key(query, max_results)
+        cached_results = self.search_cache.get(cache_key)
+        if cached_results is not None:
+            return cached_results
+        
+        try:
+            # While SerpAPI is failing, skip straight to the fallback instead of waiting out timeouts
+            data = await serpapi_breaker.call(
+                lambda: self._query_serpapi(query, max_results),
+                failure_types=(aiohttp.ClientError, asyncio.TimeoutError)
+            )
+        except Exception as e:
+            logger.error(f"SerpAPI search failed: {e}")
+            return [
+                {**result, "fallback": True}
+                for result in self._simulate_search_results(query, max_results)
+            ]
+            
+        results = []
+        for item in data.get("organic_results", [])[:max_results]:
+            results.append({
+                "title": item.get("title", ""),
+                "url": item.get("link", ""),
+                "snippet": item.get("snippet", "")
+            })
+            
+        # Don't cache API errors or empty pages
+        if results and "error" not in data:
+            self.search_cache.set(cache_key, results)
+            
+        return results
+    
+    async def _query_serpapi(self, query: str, max_results: int) -> Dict[str, Any]:
+        """Call the SerpAPI search endpoint and return its JSON payload"""
         session = await self._get_session()
         
         params = {
@@ -78,18 +281,17 @@ class WebSearchTool:
             "num": max_results
         }
         
-        async with session.get("https://serpapi.com/search", params=params) as response:
-            data = await response.json()
-            
-            results = []
-            for item in data.get("organic_results", [])[:max_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", "")
-                })
-            
-            return results
+        timeout = aiohttp.ClientTimeout(total=config.SERPAPI_TIMEOUT)
+        async with session.get("https://serpapi.com/search", params=params, timeout=timeout) as response:
+            # Server errors count against the breaker; client errors come back as {"error": ...}
+            if response.status >= 500:
+                response.raise_for_status()
+            return await response.json()
+    
+    @staticmethod
+    def _search_cache_key(query: str, max_results: int) -> str:
+        """Build a cache key that folds case and whitespace differences in the query"""
+        return f"{max_results}:{normalize_query(query)}"
     
     def _simulate_search_results(self, query: str, max_results: int) -> List[Dict]:
         """Simulate search results when no API key is available"""
@@ -103,9 +305,78 @@ class WebSearchTool:
             for i in range(max_results)
         ]
     
+    async def _fetch_with_limits(self, url: str) -> str:
+        """
+        Extract article content politely: under the global and per-host concurrency
+        limits and the per-host request rate, retrying hosts that ask us to back off
+        """
+        if self._fetch_semaphore is None:
+            self._fetch_semaphore = asyncio.Semaphore(config.WEB_FETCH_CONCURRENCY)
+        
+        host = urlparse(url).netloc.lower()
+        state = self._host_state(host)
+        state.active += 1
+        try:
+            for attempt in range(1, config.WEB_FETCH_MAX_ATTEMPTS + 1):
+                try:
+                    # Take the host slot and rate budget first so a busy host doesn't hold global slots
+                    async with state.semaphore:
+                        await state.limiter.acquire()
+                        async with self._fetch_semaphore:
+                            return await self._extract_article_content(url)
+                except FetchThrottled as e:
+                    self.fetch_stats["throttled"] += 1
+                    if attempt >= config.WEB_FETCH_MAX_ATTEMPTS:
+                        break
+                    # Pause the whole host, not just this URL, before the next attempt
+                    delay = e.retry_after
+                    if delay is None:
+                        delay = backoff_delay(attempt, config.RETRY_BASE_DELAY, config.RETRY_MAX_DELAY)
+                    state.limiter.penalize(min(delay, config.RETRY_MAX_DELAY))
+                    self.fetch_stats["retried"] += 1
+        finally:
+            state.active -= 1
+        
+        logger.warning(f"Dropping {url}: {host} is still throttling after {config.WEB_FETCH_MAX_ATTEMPTS} attempts")
+        self.fetch_stats["dropped"] += 1
+        return ""
+    
+    def _host_state(self, host: str) -> _HostState:
+        """
+        Get a host's fetch limits, creating them on first use
+        
+        The tool lives as long as the server, so only the most recently used
+        WEB_FETCH_MAX_TRACKED_HOSTS hosts are kept. Hosts with fetches in flight
+        are never dropped, so their limits always hold.
+        """
+        state = self._hosts.get(host)
+        if state is not None:
+            self._hosts.move_to_end(host)
+            return state
+        
+        state = self._hosts[host] = _HostState(host)
+        excess = len(self._hosts) - config.WEB_FETCH_MAX_TRACKED_HOSTS
+        if excess > 0:
+            idle = [name for name, other in self._hosts.items() if other.active == 0 and other is not state]
+            for name in idle[:excess]:
+                del self._hosts[name]
+        return state
+    
+    async def _update_page_cache(self, write: Callable[..., None], url: str, *args: Any):
+        """Run a page cache write off the event loop; a failed write never costs the content"""
+        try:
+            await asyncio.to_thread(write, url, *args)
+        except Exception as e:
+            logger.warning(f"Could not update the page cache for {url}: {e}")
+    
     @log(span_type="tool", name="extract_article_content")
     async def _extract_article_content(self, url: str) -> str:
         """Extract main content from an article URL"""
+        # The page cache does file I/O, so its calls run off the event loop
+        cached = await asyncio.to_thread(self.page_cache.get_entry, url) if self.page_cache else None
+        if cached and cached["fresh"]:
+            return cached["value"]["content"]
+        
         try:
             session = await self._get_session()
             
@@ -113,45 +384,52 @@ class WebSearchTool:
                 "User-Agent": "Mozilla/5.0 (compatible; TimUrbanBot/1.0)"
             }
             
+            # Revalidate stale entries instead of refetching them outright
+            if cached:
+                if cached["value"].get("etag"):
+                    headers["If-None-Match"] = cached["value"]["etag"]
+                if cached["value"].get("last_modified"):
+                    headers["If-Modified-Since"] = cached["value"]["last_modified"]
+            
             async with session.get(url, headers=headers, timeout=10) as response:
-                if response.status != 200:
-                    return ""
+                if response.status == 304 and cached:
+                    await self._update_page_cache(self.page_cache.touch, url)
+                    return cached["value"]["content"]
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                if response.status in THROTTLE_STATUSES:
+                    raise FetchThrottled(response.status, parse_retry_after(response.headers.get("Retry-After")))
                 
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
+                if response.status != 200:
+                    self.fetch_stats["dropped"] += 1
+                    return ""
                 
-                # Extract main content (simple heuristic)
-                content_selectors = [
-                    'article', 
-                    '.content', 
-                    '.post-content',
-                    '.entry-content',
-                    'main',
-                    '#content'
-                ]
+                # Skip PDFs, images and other non-HTML payloads
+                if not self.extractor.is_html(response.headers.get("Content-Type", "")):
+                    return ""
                 
-                content = ""
-                for selector in content_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        content = element.get_text(strip=True)
-                        break
+                body = await self.extractor.read_body(response)
+                content = await cpu_executor.run(
+                    "html_parse", self.extractor.extract, body, response.charset
+                )
                 
-                if not content:
-                    # Fallback to body text
-                    content = soup.get_text(strip=True)
+                if content and self.page_cache:
+                    await self._update_page_cache(self.page_cache.set, url, {
+                        "content": content,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified")
+                    })
                 
+                self.fetch_stats["fetched"] += 1
                 return content
                 
+        except FetchThrottled:
+            raise
         except Exception as e:
             logger.warning(f"Failed to extract content from {url}: {e}")
+            self.fetch_stats["dropped"] += 1
             return ""
     
     async def close(self):
         """Clean up resources"""
-        if self.session:
-            await self.session.close()
+        # The HTTP session is shared process-wide and closed by the session manager
+        pass
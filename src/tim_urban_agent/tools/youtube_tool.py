@@ -3,20 +3,31 @@ YouTube search and transcript extraction tool
 """
 import os
 import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
+import httplib2
 from googleapiclient.discovery import build
 from youtube_transcript_api import YouTubeTranscriptApi
 import logging
 from galileo import log
 
+from ..utils.circuit_breaker import youtube_breaker
+from ..utils.singleflight import SingleFlight
+
 # Try to import config, fallback to os.getenv if not available
 try:
     from ..config import config
     YOUTUBE_API_KEY = config.YOUTUBE_API_KEY
     MAX_YOUTUBE_VIDEOS = config.MAX_YOUTUBE_VIDEOS
+    YOUTUBE_CONCURRENCY = config.YOUTUBE_CONCURRENCY
+    YOUTUBE_CALL_TIMEOUT = config.YOUTUBE_CALL_TIMEOUT
 except ImportError:
     YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
     MAX_YOUTUBE_VIDEOS = int(os.getenv("MAX_YOUTUBE_VIDEOS", "3"))
+    YOUTUBE_CONCURRENCY = int(os.getenv("YOUTUBE_CONCURRENCY", "5"))
+    YOUTUBE_CALL_TIMEOUT = float(os.getenv("YOUTUBE_CALL_TIMEOUT", "15"))
 
 logger = logging.getLogger(__name__)
 
@@ -32,15 +43,57 @@ class YouTubeTool:
         else:
             self.youtube = None
             logger.warning("YouTube API key not found - using simulation mode")
+        
+        # Blocking client calls run in worker threads; httplib2 isn't thread-safe,
+        # so each thread gets its own Http object
+        self._thread_local = threading.local()
+        self._semaphore = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight = SingleFlight()
+    
+    def _thread_http(self) -> httplib2.Http:
+        http = getattr(self._thread_local, "http", None)
+        if http is None:
+            http = httplib2.Http()
+            self._thread_local.http = http
+        return http
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking client call in a worker thread, bounded and with a timeout
+        
+        Calls run on a dedicated pool rather than the default executor. A call that
+        times out keeps its slot until its thread actually returns, so a hanging
+        endpoint can't pile up more than YOUTUBE_CONCURRENCY threads.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(YOUTUBE_CONCURRENCY)
+            self._executor = ThreadPoolExecutor(max_workers=YOUTUBE_CONCURRENCY, thread_name_prefix="youtube")
+        
+        await self._semaphore.acquire()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+        future.add_done_callback(self._release_slot)
+        # Shielded so a timeout abandons the call without freeing its slot early
+        return await asyncio.wait_for(asyncio.shield(future), timeout=YOUTUBE_CALL_TIMEOUT)
+    
+    def _release_slot(self, future: asyncio.Future):
+        if not future.cancelled():
+            # Retrieve it so an abandoned call's error isn't logged as never retrieved
+            future.exception()
+        self._semaphore.release()
     
     @log(span_type="tool", name="youtube_search")
-    async def execute(self, query: str, max_videos: int = 3) -> Dict[str, Any]:
+    async def execute(self, query: str, max_videos: int = 3, fetch_transcripts: bool = True) -> Dict[str, Any]:
         """
         Search YouTube for videos and extract transcripts
         
         Args:
             query: Search query
             max_videos: Maximum number of videos to process
+            fetch_transcripts: Fetch each video's transcript; when False the videos carry
+                only their titles and descriptions
             
         Returns:
             Dictionary containing video information and transcripts
@@ -48,6 +101,12 @@ class YouTubeTool:
         try:
             # Search for videos
             video_results = await self._search_videos(query, max_videos)
+            # Simulated stand-ins for a failed API call must not be mistaken for real videos
+            fallback = any(video.get("fallback") for video in video_results)
+            
+            if not fetch_transcripts:
+                videos = [{**video, "transcript": "", "transcript_length": 0} for video in video_results]
+                return {"query": query, "videos": videos, "total_found": len(videos), "fallback": fallback}
             
             # Extract transcripts concurrently
             videos_with_transcripts = []
@@ -73,7 +132,8 @@ class YouTubeTool:
             return {
                 "query": query,
                 "videos": videos_with_transcripts,
-                "total_found": len(videos_with_transcripts)
+                "total_found": len(videos_with_transcripts),
+                "fallback": fallback
             }
             
         except Exception as e:
@@ -87,13 +147,16 @@ class YouTubeTool:
             return self._simulate_video_results(query, max_results)
         
         try:
-            search_response = self.youtube.search().list(
+            request = self.youtube.search().list(
                 q=query,
                 part="snippet",
                 maxResults=max_results,
                 type="video",
                 order="relevance"
-            ).execute()
+            )
+            search_response = await youtube_breaker.call(
+                lambda: self._run_blocking(lambda: request.execute(http=self._thread_http()))
+            )
             
             videos = []
             for item in search_response.get("items", []):
@@ -114,7 +177,10 @@ class YouTubeTool:
             
         except Exception as e:
             logger.error(f"YouTube API search failed: {e}")
-            return self._simulate_video_results(query, max_results)
+            return [
+                {**video, "fallback": True}
+                for video in self._simulate_video_results(query, max_results)
+            ]
     
     def _simulate_video_results(self, query: str, max_results: int) -> List[Dict]:
         """Simulate video results when API is not available"""
@@ -134,11 +200,21 @@ class YouTubeTool:
     @log(span_type="tool", name="get_video_transcript")
     async def _get_video_transcript(self, video_id: str) -> str:
         """Extract transcript from a YouTube video"""
+        # Concurrent requests for the same video share one fetch
+        return await self._inflight.do(video_id, lambda: self._fetch_video_transcript(video_id))
+    
+    async def _fetch_video_transcript(self, video_id: str) -> str:
+        """Fetch and join the transcript segments of a YouTube video"""
         try:
-            # Try to get transcript in English first
-            transcript_list = YouTubeTranscriptApi.get_transcript(
-                video_id, 
-                languages=['en', 'en-US', 'en-GB']
+            # Try to get transcript in English first. Only timeouts and network errors
+            # count against the breaker; videos without captions are not an outage
+            transcript_list = await youtube_breaker.call(
+                lambda: self._run_blocking(
+                    YouTubeTranscriptApi.get_transcript,
+                    video_id, 
+                    languages=['en', 'en-US', 'en-GB']
+                ),
+                failure_types=(asyncio.TimeoutError, OSError)
             )
             
             # Combine all transcript segments
@@ -0,0 +1,118 @@
+"""
+Admission control with a bounded, per-client fair wait queue
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when the wait queue is full and a request is turned away"""
+
+class AdmissionController:
+    """
+    Caps concurrent work and queues the overflow, rejecting fast once the queue is full
+    
+    Waiting requests are grouped by client and released round-robin across clients,
+    so one client's burst can't starve everyone else.
+    """
+    
+    def __init__(self, max_concurrent: int, max_queue: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.stats = {"admitted": 0, "rejected": 0, "queued_total": 0}
+        self._active = 0
+        self._queued = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+    
+    @asynccontextmanager
+    async def admit(self, client_id: str = "default") -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for the duration of the block
+        
+        Args:
+            client_id: Identifies the caller for fair queueing
+        
+        Raises:
+            AdmissionRejected: If all slots are busy and the wait queue is full
+        """
+        await self._acquire(client_id)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    async def _acquire(self, client_id: str):
+        start = time.monotonic()
+        
+        if self._active < self.max_concurrent and not self._queued:
+            self._active += 1
+        else:
+            if self._queued >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise AdmissionRejected(
+                    f"Server busy: {self._active} running and {self._queued} queued; retry later"
+                )
+            
+            future = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(client_id, deque()).append(future)
+            self._queued += 1
+            self.stats["queued_total"] += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over just as we were cancelled; pass it on
+                    self._release()
+                else:
+                    self._discard(client_id, future)
+                raise
+        
+        waited = time.monotonic() - start
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self.stats["admitted"] += 1
+    
+    def _release(self):
+        # Hand the slot straight to the next client in round-robin order
+        while self._waiting:
+            client_id, waiters = next(iter(self._waiting.items()))
+            future = waiters.popleft()
+            self._queued -= 1
+            del self._waiting[client_id]
+            if waiters:
+                self._waiting[client_id] = waiters
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+    
+    def _discard(self, client_id: str, future: asyncio.Future):
+        waiters = self._waiting.get(client_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            self._queued -= 1
+            if not waiters:
+                del self._waiting[client_id]
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Current load, queue depth per client and wait-time statistics"""
+        admitted = self.stats["admitted"]
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queued": self._queued,
+            "queued_by_client": {client_id: len(waiters) for client_id, waiters in self._waiting.items()},
+            **self.stats,
+            "wait_seconds": {
+                "mean": round(self._wait_total / admitted, 3) if admitted else 0.0,
+                "max": round(self._wait_max, 3)
+            }
+        }
@@ -0,0 +1,113 @@
+"""
+Article text extraction with byte and character budgets
+"""
+from typing import Optional, Union
+import logging
+
+from bs4 import BeautifulSoup
+
+from ..config import config
+
+# lxml is an optional speedup; fall back to the pure-Python parser without it
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+class ArticleExtractor:
+    """Extracts the main text of an article while bounding download and parse work"""
+    
+    CONTENT_SELECTORS = [
+        'article',
+        '.content',
+        '.post-content',
+        '.entry-content',
+        'main',
+        '#content'
+    ]
+    
+    READ_CHUNK_SIZE = 64 * 1024
+    
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        parser: Optional[str] = None
+    ):
+        self.max_bytes = max_bytes or config.ARTICLE_MAX_BYTES
+        self.max_chars = max_chars or config.ARTICLE_MAX_CHARS
+        self.parser = parser or config.HTML_PARSER or DEFAULT_PARSER
+    
+    @staticmethod
+    def is_html(content_type: str) -> bool:
+        """Check whether a Content-Type header describes an HTML document"""
+        # A missing header is given the benefit of the doubt
+        return not content_type or "html" in content_type.lower()
+    
+    async def read_body(self, response) -> bytes:
+        """
+        Read a response body, stopping once the byte limit is reached
+        
+        Args:
+            response: An aiohttp response
+        
+        Returns:
+            At most max_bytes of the raw body
+        """
+        chunks = []
+        total = 0
+        async for chunk in response.content.iter_chunked(self.READ_CHUNK_SIZE):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= self.max_bytes:
+                break
+        return b"".join(chunks)[:self.max_bytes]
+    
+    def extract(self, markup: Union[str, bytes], encoding: Optional[str] = None) -> str:
+        """
+        Extract the main text content from an HTML document
+        
+        Args:
+            markup: Raw HTML, as text or bytes
+            encoding: Declared encoding for byte input, if known
+        
+        Returns:
+            Article text, at most max_chars long
+        """
+        if isinstance(markup, bytes):
+            soup = BeautifulSoup(markup, self.parser, from_encoding=encoding)
+        else:
+            soup = BeautifulSoup(markup, self.parser)
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # Extract main content (simple heuristic)
+        content = ""
+        for selector in self.CONTENT_SELECTORS:
+            element = soup.select_one(selector)
+            if element:
+                content = self._collect_text(element)
+                break
+        
+        if not content:
+            # Fallback to body text
+            content = self._collect_text(soup)
+        
+        return content
+    
+    def _collect_text(self, root) -> str:
+        """Join stripped text nodes, stopping once the character budget is filled"""
+        parts = []
+        length = 0
+        for text in root.stripped_strings:
+            parts.append(text)
+            length += len(text)
+            if length >= self.max_chars:
+                break
+        
+        return "".join(parts)[:self.max_chars]
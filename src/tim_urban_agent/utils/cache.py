@@ -0,0 +1,195 @@
+"""
+Caching utilities shared by the research tools
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def normalize_query(text: str) -> str:
+    """Fold case and whitespace so trivially different queries share a cache key"""
+    return " ".join(text.lower().split())
+
+def stable_hash(value: Any) -> str:
+    """Content hash of a JSON-serializable value, stable across processes"""
+    data = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+class TTLCache:
+    """In-memory LRU cache with TTL expiry"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value if it is present and still fresh"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self._entries.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+    
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries if over capacity"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskCache:
+    """JSON-backed on-disk cache with TTL expiry and size-bounded LRU eviction"""
+    
+    def __init__(self, directory: str, ttl: float, max_bytes: int):
+        self.directory = Path(directory).expanduser()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "refreshed": 0, "writes": 0, "evictions": 0}
+        self._total_bytes: Optional[int] = None
+    
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+    
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            self._total_bytes = None
+            return None
+        
+        if record.get("key") != key:
+            return None
+        return record
+    
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cache entry, including expired ones
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Dictionary with "value", "stored_at" and "fresh", or None on a miss
+        """
+        record = self._read(key)
+        if record is None:
+            self.stats["misses"] += 1
+            return None
+        
+        fresh = time.time() - record["stored_at"] < self.ttl
+        self.stats["hits" if fresh else "stale"] += 1
+        
+        # File mtime doubles as the LRU clock
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        
+        return {"value": record["value"], "stored_at": record["stored_at"], "fresh": fresh}
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value if it is present and still fresh"""
+        entry = self.get_entry(key)
+        if entry and entry["fresh"]:
+            return entry["value"]
+        return None
+    
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value and evict old entries if over the size limit"""
+        self._write(key, value)
+        self.stats["writes"] += 1
+        self._evict()
+    
+    def touch(self, key: str):
+        """Mark an existing entry as freshly validated without changing its value"""
+        record = self._read(key)
+        if record is not None:
+            self._write(key, record["value"])
+            self.stats["refreshed"] += 1
+    
+    def _write(self, key: str, value: Any):
+        path = self._path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"key": key, "stored_at": time.time(), "value": value})
+        
+        old_size = path.stat().st_size if path.exists() else 0
+        # A unique temp file per write, since threads may write the same key at once
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        
+        if self._total_bytes is not None:
+            self._total_bytes += path.stat().st_size - old_size
+    
+    def _evict(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+        if self._total_bytes <= self.max_bytes:
+            return
+        
+        entries = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._total_bytes -= self._remove(path)
+            self.stats["evictions"] += 1
+    
+    def _remove(self, path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            return size
+        except OSError:
+            return 0
+
+class TieredCache:
+    """In-memory LRU cache in front of an optional on-disk tier"""
+    
+    def __init__(self, memory: TTLCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a fresh value from memory, falling back to (and promoting from) disk"""
+        value = self.memory.get(key)
+        if value is None and self.disk:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+    
+    def set(self, key: str, value: Any):
+        """Store a value in every tier"""
+        self.memory.set(key, value)
+        if self.disk:
+            self.disk.set(key, value)
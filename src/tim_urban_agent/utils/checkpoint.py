@@ -0,0 +1,70 @@
+"""
+Durable per-job checkpoints for resuming interrupted research runs
+"""
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class CheckpointStore:
+    """Stores each completed phase of a job as a JSON file under the job's directory"""
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory).expanduser()
+    
+    def _job_dir(self, job_id: str) -> Path:
+        if not JOB_ID_PATTERN.match(job_id):
+            raise ValueError(f"Invalid job ID: {job_id!r}")
+        return self.directory / job_id
+    
+    def save(self, job_id: str, phase: str, value: Any):
+        """Persist a completed phase's output"""
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        
+        path = job_dir / f"{phase}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    
+    def load(self, job_id: str) -> Dict[str, Any]:
+        """
+        Load every completed phase of a job
+        
+        Args:
+            job_id: The job to load
+            
+        Returns:
+            Dictionary mapping phase names to their saved outputs (empty for unknown jobs)
+        """
+        job_dir = self._job_dir(job_id)
+        phases = {}
+        for path in sorted(job_dir.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    phases[path.stem] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return phases
+    
+    def clear(self, job_id: str):
+        """Remove all checkpoints of a job"""
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+    
+    def prune(self, max_age: float):
+        """Remove jobs whose checkpoints haven't been touched in max_age seconds"""
+        if not self.directory.exists():
+            return
+        cutoff = time.time() - max_age
+        for job_dir in self.directory.iterdir():
+            if job_dir.is_dir() and job_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(job_dir, ignore_errors=True)
@@ -0,0 +1,154 @@
+"""
+Circuit breakers that fail fast while an upstream provider is degraded
+"""
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, Type, TypeVar
+import logging
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+class CircuitBreaker:
+    """
+    Tracks a provider's recent failure rate and short-circuits calls while it is too high
+    
+    Closed: calls go through and outcomes are recorded in a rolling window.
+    Open: calls fail immediately with CircuitOpen until reset_timeout has passed.
+    Half-open: a limited number of probe calls go through; a success closes the
+    breaker and a failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        half_open_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.min_calls = min_calls or config.BREAKER_MIN_CALLS
+        self.reset_timeout = reset_timeout if reset_timeout is not None else config.BREAKER_RESET_TIMEOUT
+        self.half_open_calls = half_open_calls
+        self.state = self.CLOSED
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._outcomes: Deque[bool] = deque(maxlen=window or config.BREAKER_WINDOW)
+        self._opened_at = 0.0
+        self._probes = 0
+    
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        failure_types: Tuple[Type[BaseException], ...] = (Exception,)
+    ) -> T:
+        """
+        Call func through the breaker
+        
+        Args:
+            func: Zero-argument callable returning the awaitable to run
+            failure_types: Exceptions that count as provider failures; other
+                exceptions propagate without affecting the breaker
+        
+        Returns:
+            func's result
+        
+        Raises:
+            CircuitOpen: If the breaker is open (or its half-open probes are taken)
+        """
+        self._before_call()
+        probing = self.state == self.HALF_OPEN
+        try:
+            result = await func()
+        except failure_types:
+            self._record(False)
+            raise
+        except BaseException as e:
+            if probing:
+                self._probes -= 1
+            if isinstance(e, Exception):
+                # The provider answered; the request itself was bad
+                self._record(True)
+            raise
+        self._record(True)
+        return result
+    
+    def _before_call(self):
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                raise CircuitOpen(f"{self.name} circuit is open; using fallback")
+            self.state = self.HALF_OPEN
+            self._probes = 0
+            logger.info(f"{self.name} circuit half-open; probing")
+        
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self.stats["rejected"] += 1
+                raise CircuitOpen(f"{self.name} circuit is half-open and already probing; using fallback")
+            self._probes += 1
+    
+    def _record(self, success: bool):
+        self.stats["successes" if success else "failures"] += 1
+        
+        if self.state == self.HALF_OPEN:
+            if success:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+                logger.info(f"{self.name} circuit closed")
+            else:
+                self._open()
+            return
+        
+        if self.state == self.CLOSED:
+            self._outcomes.append(success)
+            if len(self._outcomes) >= self.min_calls and self.failure_rate() >= self.failure_threshold:
+                self._open()
+    
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        logger.warning(
+            f"{self.name} circuit opened (failure rate {self.failure_rate():.0%}); "
+            f"failing fast for {self.reset_timeout:.0f}s"
+        )
+    
+    def failure_rate(self) -> float:
+        """Share of failed calls in the rolling window"""
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Current state, rolling failure rate and counters"""
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "window_calls": len(self._outcomes),
+            **self.stats
+        }
+
+# One breaker per upstream provider, shared across the process
+serpapi_breaker = CircuitBreaker("serpapi")
+youtube_breaker = CircuitBreaker("youtube")
+anthropic_breaker = CircuitBreaker("anthropic")
+openai_breaker = CircuitBreaker("openai")
+
+BREAKERS = (serpapi_breaker, youtube_breaker, anthropic_breaker, openai_breaker)
+
+def breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every provider breaker, keyed by provider"""
+    return {breaker.name: breaker.metrics() for breaker in BREAKERS}
@@ -0,0 +1,48 @@
+"""
+Time budget shared by every phase of a research run
+"""
+import time
+from typing import Optional
+
+class Deadline:
+    """
+    A point in time a run must finish by, measured on the monotonic clock
+    
+    A deadline without a budget never expires, so callers can pass one around
+    unconditionally.
+    """
+    
+    def __init__(self, time_budget: Optional[float] = None):
+        self.time_budget = time_budget
+        self._expires_at = time.monotonic() + time_budget if time_budget is not None else None
+    
+    @property
+    def bounded(self) -> bool:
+        """Whether there is a budget at all"""
+        return self._expires_at is not None
+    
+    def remaining(self) -> float:
+        """Seconds left (never negative; infinite without a budget)"""
+        if self._expires_at is None:
+            return float("inf")
+        return max(0.0, self._expires_at - time.monotonic())
+    
+    def expired(self) -> bool:
+        """Whether the budget is spent"""
+        return self.remaining() <= 0
+    
+    def timeout(self, share: float = 1.0, cap: Optional[float] = None) -> Optional[float]:
+        """
+        Timeout for a step that may use a share of the remaining time
+        
+        Args:
+            share: Fraction of the remaining time the step may use
+            cap: Upper bound on the timeout, if any
+            
+        Returns:
+            Seconds, or cap (possibly None) when there is no budget
+        """
+        if self._expires_at is None:
+            return cap
+        timeout = self.remaining() * share
+        return min(timeout, cap) if cap is not None else timeout
@@ -0,0 +1,80 @@
+"""
+Worker pool for CPU-bound pipeline stages
+"""
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+class CPUExecutor:
+    """Dispatches CPU-heavy work (parsing, analysis, rendering) off the event loop"""
+    
+    def __init__(self, kind: Optional[str] = None, max_workers: Optional[int] = None):
+        self.kind = kind or config.CPU_EXECUTOR_KIND
+        self.max_workers = max_workers or config.CPU_EXECUTOR_WORKERS or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+        self._timings: Dict[str, Dict[str, float]] = {}
+    
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Process workers give true multi-core parallelism; callables and
+                # arguments must be picklable
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif self.kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="tim-urban-cpu"
+                )
+            else:
+                raise ValueError(f"Unknown CPU executor kind: {self.kind}")
+            logger.info(f"Started {self.kind} pool with {self.max_workers} workers")
+        return self._executor
+    
+    async def run(self, stage: str, func: Callable, *args: Any) -> Any:
+        """
+        Run a CPU-bound callable on the worker pool
+        
+        Args:
+            stage: Stage name used for timing metrics
+            func: The callable to run
+            *args: Positional arguments for the callable
+            
+        Returns:
+            Whatever the callable returns
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+        finally:
+            self._record(stage, time.perf_counter() - start)
+    
+    def _record(self, stage: str, elapsed: float):
+        timing = self._timings.setdefault(stage, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        timing["calls"] += 1
+        timing["total_seconds"] += elapsed
+        timing["max_seconds"] = max(timing["max_seconds"], elapsed)
+    
+    def get_timings(self) -> Dict[str, Dict[str, float]]:
+        """Get per-stage call counts and wall-clock timings (including queueing)"""
+        return {
+            stage: {**timing, "avg_seconds": timing["total_seconds"] / timing["calls"]}
+            for stage, timing in self._timings.items()
+        }
+    
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pool; it is recreated on next use"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+# Process-wide pool shared by all tools
+cpu_executor = CPUExecutor()
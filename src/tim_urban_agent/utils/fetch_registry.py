@@ -0,0 +1,76 @@
+"""
+Per-run registry that fetches each distinct page once across all of a run's queries
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+import logging
+
+from .novelty import AdaptiveGate
+from .singleflight import SingleFlight
+from .text_processor import TextProcessor
+
+logger = logging.getLogger(__name__)
+
+class FetchRegistry:
+    """
+    Dedupes page fetches by canonical URL for the lifetime of one research run
+    
+    Search results for related queries overlap heavily, often with cosmetic URL
+    differences (tracking parameters, trailing slashes, http vs https). The first
+    request for a page fetches it; concurrent requests join that fetch and later
+    ones reuse its content.
+    
+    With a gate, fetches are issued a few at a time and each new page is
+    skipped once the gate closes.
+    """
+    
+    def __init__(self, gate: Optional[AdaptiveGate] = None, concurrency: int = 3):
+        self.gate = gate
+        self.stats = {"requested": 0, "fetched": 0, "skipped": 0}
+        self._contents: Dict[str, str] = {}
+        self._inflight = SingleFlight()
+        # Few enough fetches in flight that the gate can stop the rest
+        self._slots = asyncio.Semaphore(concurrency) if gate is not None else None
+    
+    async def fetch(self, url: str, fetch: Callable[[str], Awaitable[str]]) -> str:
+        """
+        Get a page's content, fetching it only if no variant of its URL was fetched yet
+        
+        Args:
+            url: Page URL
+            fetch: Coroutine function that fetches and extracts a URL's content
+            
+        Returns:
+            The page content, or "" if the gate skipped it
+        """
+        self.stats["requested"] += 1
+        key = TextProcessor.canonicalize_url(url)
+        if key in self._contents:
+            logger.debug(f"Reusing fetched content for {url}")
+            return self._contents[key]
+        
+        async def run() -> str:
+            self.stats["fetched"] += 1
+            content = await fetch(url)
+            self._contents[key] = content
+            return content
+        
+        async def gated_run() -> str:
+            async with self._slots:
+                if not self.gate.is_open():
+                    self.stats["skipped"] += 1
+                    return ""
+                content = await run()
+                self.gate.record(content)
+                return content
+        
+        return await self._inflight.do(key, run if self.gate is None else gated_run)
+    
+    @property
+    def saved(self) -> int:
+        """Fetches avoided because another query already requested the page"""
+        return self.stats["requested"] - self.stats["fetched"] - self.stats["skipped"]
+    
+    def metrics(self) -> Dict[str, int]:
+        """Requested, fetched, skipped (by the gate) and saved page counts"""
+        return {**self.stats, "saved": self.saved}
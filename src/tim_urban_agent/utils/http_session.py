@@ -0,0 +1,63 @@
+"""
+Shared HTTP session management
+"""
+import asyncio
+from typing import Optional
+import logging
+
+import aiohttp
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+class HTTPSessionManager:
+    """Owns a single long-lived aiohttp session shared by every tool in the process"""
+    
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session, creating it on first use
+        
+        A new session is created if the previous one was closed or belongs to
+        a different event loop (sessions can't be shared across loops).
+        
+        Returns:
+            The shared aiohttp session
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_POOL_SIZE,
+                limit_per_host=config.HTTP_POOL_PER_HOST,
+                ttl_dns_cache=config.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            logger.debug("Created shared HTTP session")
+        return self._session
+    
+    async def close(self):
+        """Close the shared session and release all pooled connections"""
+        session, self._session = self._session, None
+        loop, self._loop = self._loop, None
+        
+        if session is None or session.closed:
+            return
+        
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if loop is running_loop:
+            await session.close()
+        else:
+            logger.warning("Shared HTTP session belongs to another event loop; dropping it")
+
+# Process-wide session manager shared by the agent and all MCP tool handlers
+session_manager = HTTPSessionManager()
@@ -0,0 +1,255 @@
+"""
+Persistent research job queue and the worker pool that drains it
+"""
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    phase TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+)
+"""
+
+class JobQueue:
+    """SQLite-backed FIFO of research jobs that survives server restarts"""
+    
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    
+    def __init__(self, path: str):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at)")
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived autocommit connection per call keeps the queue safe to use from worker threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    def submit(self, params: Dict[str, Any]) -> str:
+        """
+        Enqueue a job
+        
+        Args:
+            params: JSON-serializable keyword arguments for research_topic
+        
+        Returns:
+            The new job's ID
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, params, status, submitted_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(params), self.QUEUED, time.time())
+            )
+        return job_id
+    
+    def claim(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Atomically mark the oldest queued job as running and return its ID and params"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, params FROM jobs WHERE status = ? ORDER BY submitted_at LIMIT 1",
+                    (self.QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, phase = NULL WHERE id = ?",
+                        (self.RUNNING, time.time(), row["id"])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        
+        return (row["id"], json.loads(row["params"])) if row else None
+    
+    def set_phase(self, job_id: str, phase: Optional[str]):
+        """Record the phase(s) a running job is currently in"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET phase = ? WHERE id = ?", (phase, job_id))
+    
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        """Store a finished job's result"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, phase = NULL, finished_at = ?, result = ? WHERE id = ?",
+                (self.COMPLETED, time.time(), json.dumps(result), job_id)
+            )
+    
+    def fail(self, job_id: str, error: str):
+        """Mark a job as failed"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (self.FAILED, time.time(), error, job_id)
+            )
+    
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's progress
+        
+        Args:
+            job_id: The job to look up
+        
+        Returns:
+            Dictionary with status, current phase, timings and any error, or None for unknown jobs
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, params, status, phase, submitted_at, started_at, finished_at, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        now = time.time()
+        started_at = row["started_at"]
+        return {
+            "job_id": row["id"],
+            "topic": json.loads(row["params"]).get("topic"),
+            "status": row["status"],
+            "phase": row["phase"],
+            "queued_seconds": round((started_at or now) - row["submitted_at"], 1),
+            "elapsed_seconds": round((row["finished_at"] or now) - started_at, 1) if started_at else 0.0,
+            "error": row["error"]
+        }
+    
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a completed job's result, or None if it hasn't completed"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result FROM jobs WHERE id = ? AND status = ?", (job_id, self.COMPLETED)
+            ).fetchone()
+        return json.loads(row["result"]) if row else None
+    
+    def requeue_running(self) -> List[str]:
+        """Put jobs left running by a previous process back in the queue; returns their IDs"""
+        with self._connect() as conn:
+            ids = [row["id"] for row in conn.execute("SELECT id FROM jobs WHERE status = ?", (self.RUNNING,))]
+            conn.execute(
+                "UPDATE jobs SET status = ?, phase = NULL, started_at = NULL WHERE status = ?",
+                (self.QUEUED, self.RUNNING)
+            )
+        return ids
+    
+    def prune(self, max_age: float):
+        """Delete finished jobs older than max_age seconds"""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (self.COMPLETED, self.FAILED, time.time() - max_age)
+            )
+
+class JobWorkerPool:
+    """Async workers that drain a JobQueue through the research agent"""
+    
+    def __init__(self, queue: JobQueue, agent, workers: int, poll_interval: float = 1.0):
+        self.queue = queue
+        self.agent = agent
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def start(self):
+        """Recover interrupted jobs and start the workers"""
+        recovered = self.queue.requeue_running()
+        if recovered:
+            # Interrupted jobs resume from their checkpoints, which share the job ID
+            logger.info(f"Requeued {len(recovered)} interrupted job(s)")
+        
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+    
+    def notify(self):
+        """Wake idle workers after a submission instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def stop(self):
+        """Cancel the workers; running jobs are requeued on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _work(self, worker: int):
+        while True:
+            # Clear before claiming so a submission racing with an empty claim still wakes us
+            self._wakeup.clear()
+            try:
+                claimed = await asyncio.to_thread(self.queue.claim)
+            except sqlite3.Error as e:
+                logger.error(f"Worker {worker} could not claim a job: {e}")
+                claimed = None
+            
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            job_id, params = claimed
+            logger.info(f"Worker {worker} running job {job_id}: {params.get('topic')}")
+            try:
+                await self._run(job_id, params)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # E.g. the result couldn't be stored; fail the job but keep the worker alive
+                logger.error(f"Worker {worker} could not finish job {job_id}: {e}")
+                try:
+                    await asyncio.to_thread(self.queue.fail, job_id, str(e))
+                except sqlite3.Error as fail_error:
+                    logger.error(f"Worker {worker} could not mark job {job_id} failed: {fail_error}")
+    
+    async def _run(self, job_id: str, params: Dict[str, Any]):
+        running: List[str] = []
+        
+        async def on_progress(phase: str, event: str):
+            if event == "started":
+                running.append(phase)
+            elif phase in running:
+                running.remove(phase)
+            await asyncio.to_thread(self.queue.set_phase, job_id, ", ".join(running) or None)
+        
+        try:
+            result = await self.agent.research_topic(**params, job_id=job_id, on_progress=on_progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await asyncio.to_thread(self.queue.fail, job_id, str(e))
+            return
+        
+        await asyncio.to_thread(self.queue.complete, job_id, result)
@@ -0,0 +1,114 @@
+"""
+Novelty scoring and the stopping rule for adaptive research gathering
+"""
+import re
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+class NoveltyTracker:
+    """Scores documents by the share of their word shingles the corpus hasn't seen yet"""
+    
+    def __init__(self, shingle_size: int = 3):
+        self.shingle_size = shingle_size
+        self._seen: Set[Tuple[str, ...]] = set()
+    
+    def _shingles(self, text: str) -> Set[Tuple[str, ...]]:
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        if len(words) < self.shingle_size:
+            return {tuple(words)} if words else set()
+        return {
+            tuple(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+    
+    def score(self, text: str) -> float:
+        """Share of the document's shingles not yet in the corpus (0.0 for empty text)"""
+        shingles = self._shingles(text)
+        if not shingles:
+            return 0.0
+        return len(shingles - self._seen) / len(shingles)
+    
+    def add(self, text: str) -> float:
+        """Score a document, then add it to the corpus; returns its novelty"""
+        shingles = self._shingles(text)
+        if not shingles:
+            return 0.0
+        novelty = len(shingles - self._seen) / len(shingles)
+        self._seen |= shingles
+        return novelty
+
+class AdaptiveGate:
+    """
+    Decides when gathering more pages has stopped paying off
+    
+    Each fetched document is scored for novelty against everything gathered so
+    far. The gate closes once the mean novelty of the last `window` documents
+    drops below the threshold (after at least min_documents), or once the time
+    or byte budget is spent. A budget of 0 disables that limit.
+    """
+    
+    def __init__(
+        self,
+        novelty_threshold: Optional[float] = None,
+        window: Optional[int] = None,
+        min_documents: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        byte_budget: Optional[int] = None
+    ):
+        self.novelty_threshold = novelty_threshold if novelty_threshold is not None else config.ADAPTIVE_NOVELTY_THRESHOLD
+        self.window = window or config.ADAPTIVE_NOVELTY_WINDOW
+        self.min_documents = min_documents if min_documents is not None else config.ADAPTIVE_MIN_DOCUMENTS
+        self.time_budget = time_budget if time_budget is not None else config.ADAPTIVE_TIME_BUDGET
+        self.byte_budget = byte_budget if byte_budget is not None else config.ADAPTIVE_BYTE_BUDGET
+        self.tracker = NoveltyTracker()
+        self.stop_reason: Optional[str] = None
+        self.scores: List[float] = []
+        self.bytes = 0
+        self._started = time.monotonic()
+    
+    def is_open(self) -> bool:
+        """Whether another fetch is still worth issuing"""
+        if self.stop_reason is None:
+            if self.time_budget and time.monotonic() - self._started >= self.time_budget:
+                self._stop("time")
+            elif self.byte_budget and self.bytes >= self.byte_budget:
+                self._stop("bytes")
+        return self.stop_reason is None
+    
+    def record(self, text: str):
+        """Score a fetched document and close the gate if recent documents added too little"""
+        if not text:
+            # Failed or empty fetches cost time but say nothing about novelty
+            return
+        self.scores.append(self.tracker.add(text))
+        self.bytes += len(text.encode("utf-8"))
+        
+        recent = self.scores[-self.window:]
+        if (
+            self.stop_reason is None
+            and len(self.scores) >= max(self.min_documents, self.window)
+            and sum(recent) / len(recent) < self.novelty_threshold
+        ):
+            self._stop("novelty")
+    
+    def _stop(self, reason: str):
+        self.stop_reason = reason
+        logger.info(
+            f"Stopping gathering ({reason}) after {len(self.scores)} documents "
+            f"and {self.bytes} bytes in {time.monotonic() - self._started:.1f}s"
+        )
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Why gathering stopped (None if it ran to completion) and what it consumed"""
+        return {
+            "stop_reason": self.stop_reason,
+            "documents": len(self.scores),
+            "bytes": self.bytes,
+            "elapsed": round(time.monotonic() - self._started, 3),
+            "novelty": [round(score, 3) for score in self.scores]
+        }
@@ -0,0 +1,116 @@
+"""
+Dependency-graph scheduler for the research pipeline
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Pipeline:
+    """Runs named async phases as a DAG, starting each one as soon as its dependencies finish"""
+    
+    def __init__(
+        self,
+        on_phase_start: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_phase_complete: Optional[Callable[[str, Any], Awaitable[None]]] = None
+    ):
+        self._phases: Dict[str, Tuple[Callable[..., Awaitable[Any]], List[str]]] = {}
+        self._on_phase_start = on_phase_start
+        self._on_phase_complete = on_phase_complete
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.resumed: List[str] = []
+    
+    def add_phase(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Sequence[str] = ()
+    ):
+        """
+        Register a phase
+        
+        Args:
+            name: Unique phase name
+            func: Async callable receiving each dependency's result as a keyword argument
+            depends_on: Names of phases (already registered) whose results this phase needs
+        """
+        for dependency in depends_on:
+            if dependency not in self._phases:
+                raise ValueError(f"Phase '{name}' depends on unknown phase '{dependency}'")
+        self._phases[name] = (func, list(depends_on))
+    
+    async def run(self, completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run all phases with maximum overlap
+        
+        Args:
+            completed: Results of phases finished by an earlier run; these are not rerun
+        
+        Returns:
+            Dictionary mapping phase names to their results
+        """
+        completed = completed or {}
+        started_at = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        
+        async def run_phase(name: str) -> Any:
+            if name in completed:
+                self.resumed.append(name)
+                return completed[name]
+            
+            func, dependencies = self._phases[name]
+            inputs = {dependency: await tasks[dependency] for dependency in dependencies}
+            
+            if self._on_phase_start is not None:
+                await self._on_phase_start(name)
+            start = time.perf_counter() - started_at
+            result = await func(**inputs)
+            end = time.perf_counter() - started_at
+            
+            self.timings[name] = {"start": start, "end": end, "duration": end - start}
+            logger.debug(f"Phase '{name}' finished in {end - start:.2f}s")
+            
+            if self._on_phase_complete is not None:
+                await self._on_phase_complete(name, result)
+            return result
+        
+        for name in self._phases:
+            tasks[name] = asyncio.create_task(run_phase(name))
+        
+        try:
+            try:
+                await asyncio.gather(*tasks.values())
+            except Exception:
+                # Let phases that don't depend on the failure finish (and checkpoint) so a
+                # resumed run needn't redo them; its dependents fail as soon as they await it
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+                raise
+        except BaseException:
+            # Cancelled from outside (or the wait above was): stop everything
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        
+        return {name: task.result() for name, task in tasks.items()}
+    
+    def critical_path(self) -> List[str]:
+        """
+        Get the chain of phases that determined the total run time
+        
+        Walks back from the last phase to finish, at each step following the
+        dependency that finished last.
+        """
+        if not self.timings:
+            return []
+        
+        path = []
+        current = max(self.timings, key=lambda name: self.timings[name]["end"])
+        while current is not None:
+            path.append(current)
+            dependencies = [d for d in self._phases[current][1] if d in self.timings]
+            current = max(dependencies, key=lambda d: self.timings[d]["end"]) if dependencies else None
+        
+        return list(reversed(path))
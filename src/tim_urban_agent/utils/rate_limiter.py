@@ -0,0 +1,156 @@
+"""
+Process-wide request and token budgets for rate-limited provider APIs
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+import logging
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count for prompt text (about four characters per token)"""
+    return sum(len(text) for text in texts) // 4 + 1
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into a delay in seconds
+    
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+    
+    Returns:
+        Non-negative delay in seconds, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def retry_after_from_error(error: BaseException) -> Optional[float]:
+    """Read the Retry-After delay from an SDK error's HTTP response, if it has one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    return parse_retry_after(headers.get("retry-after"))
+
+class TokenBucket:
+    """Continuously refilling budget of units per minute"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self._updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def delay_for(self, amount: float) -> float:
+        """Seconds until amount units are available (requests larger than capacity wait for a full bucket)"""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+    
+    def consume(self, amount: float):
+        """Take amount units; the balance may go negative to record usage beyond an estimate"""
+        self._refill()
+        self.tokens -= amount
+
+class RateLimiter:
+    """
+    Schedules calls to one provider within its requests- and tokens-per-minute quotas
+    
+    Callers wait in FIFO order until both budgets can cover their request. A 429's
+    Retry-After pauses every caller of the provider, not just the one that hit it.
+    A budget of 0 disables that limit.
+    """
+    
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float = 0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.stats = {"requests": 0, "delayed": 0, "wait_seconds": 0.0, "rate_limited": 0}
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_lock(self) -> asyncio.Lock:
+        # Locks are bound to the loop that first waits on them; rebuild for a new loop
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+    
+    def _delay(self, tokens: int) -> float:
+        delay = self._blocked_until - time.monotonic()
+        if self.requests:
+            delay = max(delay, self.requests.delay_for(1))
+        if self.tokens and tokens:
+            delay = max(delay, self.tokens.delay_for(tokens))
+        return delay
+    
+    async def acquire(self, tokens: int = 0):
+        """
+        Wait until a request of the given estimated size fits within the budgets
+        
+        Args:
+            tokens: Estimated tokens the request will consume
+        """
+        async with self._get_lock():
+            start = time.monotonic()
+            delay = self._delay(tokens)
+            if delay > 0:
+                self.stats["delayed"] += 1
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self._delay(tokens)
+            
+            if self.requests:
+                self.requests.consume(1)
+            if self.tokens and tokens:
+                self.tokens.consume(tokens)
+            self.stats["requests"] += 1
+            self.stats["wait_seconds"] += time.monotonic() - start
+    
+    def settle(self, estimated: int, actual: int):
+        """Correct the token budget once a call reports its real usage"""
+        if self.tokens:
+            self.tokens.consume(actual - estimated)
+    
+    def penalize(self, retry_after: Optional[float]):
+        """Pause all callers after the provider rejected a call with a rate-limit error"""
+        delay = retry_after if retry_after is not None else config.RETRY_BASE_DELAY
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self.stats["rate_limited"] += 1
+        logger.warning(f"{self.name} rate limit hit; pausing calls for {delay:.1f}s")
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Budgets, current balances and wait statistics"""
+        return {
+            "requests_per_minute": self.requests.capacity if self.requests else None,
+            "tokens_per_minute": self.tokens.capacity if self.tokens else None,
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 3)
+        }
+
+# Shared by every agent and tool in the process, since quotas are per API key
+anthropic_limiter = RateLimiter("anthropic", config.ANTHROPIC_RPM, config.ANTHROPIC_TPM)
+openai_image_limiter = RateLimiter("openai_images", config.OPENAI_IMAGES_PER_MINUTE)
@@ -6,6 +6,8 @@ from typing import Dict, List, Any
 from collections import Counter
 import logging
 
+from .executor import cpu_executor
+
 logger = logging.getLogger(__name__)
 
 class ResearchAggregator:
@@ -30,36 +32,41 @@ class ResearchAggregator:
             Structured analysis of the research
         """
         try:
-            # Extract all text content
-            all_text = self._extract_all_text(research_data)
+            # The regex passes are CPU-bound, so keep them off the event loop
+            return await cpu_executor.run("research_analysis", self._analyze, research_data, topic)
             
-            # Analyze content
-            key_points = self._extract_key_points(all_text, topic)
-            themes = self._identify_themes(all_text)
-            complexity_level = self._assess_complexity(all_text)
-            source_quality = self._assess_source_quality(research_data)
+        except Exception as e:
+            logger.error(f"Research analysis failed: {e}")
+            return self._fallback_analysis(topic)
+    
+    def _analyze(self, research_data: Dict[str, Any], topic: str) -> Dict[str, Any]:
+        """Run the full (synchronous) analysis of the research data"""
+        # Extract all text content
+        all_text = self._extract_all_text(research_data)
             
-            # Generate summary
-            summary = self._generate_summary(all_text, topic, key_points)
+        # Analyze content
+        key_points = self._extract_key_points(all_text, topic)
+        themes = self._identify_themes(all_text)
+        complexity_level = self._assess_complexity(all_text)
+        source_quality = self._assess_source_quality(research_data)
             
-            # Identify gaps
-            potential_gaps = self._identify_research_gaps(key_points, topic)
+        # Generate summary
+        summary = self._generate_summary(all_text, topic, key_points)
             
-            return {
-                "topic": topic,
-                "summary": summary,
-                "key_points": key_points,
-                "themes": themes,
-                "complexity": complexity_level,
-                "source_quality": source_quality,
-                "potential_gaps": potential_gaps,
-                "total_sources": self._count_sources(research_data),
-                "word_count": len(all_text.split())
-            }
+        # Identify gaps
+        potential_gaps = self._identify_research_gaps(key_points, topic)
             
-        except Exception as e:
-            logger.error(f"Research analysis failed: {e}")
-            return self._fallback_analysis(topic)
+        return {
+            "topic": topic,
+            "summary": summary,
+            "key_points": key_points,
+            "themes": themes,
+            "complexity": complexity_level,
+            "source_quality": source_quality,
+            "potential_gaps": potential_gaps,
+            "total_sources": self._count_sources(research_data),
+            "word_count": len(all_text.split())
+        }
     
     def _extract_all_text(self, research_data: Dict[str, Any]) -> str:
         """Extract all text content from research data"""
@@ -282,5 +289,6 @@ class ResearchAggregator:
             "source_quality": {"total_sources": 0, "has_academic": False},
             "potential_gaps": ["More research needed"],
             "total_sources": 0,
-            "word_count": 0
+            "word_count": 0,
+            "fallback": True
         }
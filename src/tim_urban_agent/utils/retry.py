@@ -0,0 +1,55 @@
+"""
+Retry helpers for calls to flaky upstream services
+"""
+import asyncio
+import random
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given (1-based) attempt"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+async def retry_async(
+    func: Callable[[], Awaitable[T]],
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    timeout: Optional[float] = None,
+    name: str = "call"
+) -> T:
+    """
+    Await a coroutine factory, retrying failures with jittered exponential backoff
+    
+    Cancellation is never retried: asyncio.CancelledError propagates immediately.
+    
+    Args:
+        func: Zero-argument callable returning a fresh awaitable per attempt
+        attempts: Total number of attempts (at least 1)
+        base_delay: Backoff delay before jitter for the first retry, in seconds
+        max_delay: Upper bound on any single backoff delay, in seconds
+        retry_on: Exception types that trigger a retry
+        timeout: Per-attempt timeout in seconds
+        name: Name used in log messages
+        
+    Returns:
+        The result of the first successful attempt
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            if timeout is not None:
+                return await asyncio.wait_for(func(), timeout)
+            return await func()
+        except retry_on as e:
+            if attempt >= attempts:
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(f"{name} failed (attempt {attempt}/{attempts}): {e!r}; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
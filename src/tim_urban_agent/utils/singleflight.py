@@ -0,0 +1,67 @@
+"""
+In-flight request coalescing
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class _Call:
+    """A shared in-flight computation and the number of callers waiting on it"""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single in-flight computation"""
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {"executed": 0, "coalesced": 0}
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func for key, or join the identical call already in flight
+        
+        Every caller receives the same result (or exception). A caller that is
+        cancelled detaches without disturbing the others; the shared computation
+        is only cancelled once no callers remain.
+        
+        Args:
+            key: Identity of the request
+            func: Zero-argument callable returning the awaitable to run
+            
+        Returns:
+            The shared result
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.stats["executed"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.debug(f"Joining in-flight call for {key!r}")
+        
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Everyone gave up: stop the work and don't let new callers join it
+                self._forget(key, call)
+                call.task.cancel()
+    
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+    
+    def in_flight(self) -> int:
+        """Number of distinct computations currently running"""
+        return len(self._calls)
@@ -3,11 +3,17 @@ Text processing utilities for content extraction and analysis
 """
 import re
 from typing import List, Dict, Any
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "ref", "ref_src", "_ga", "_hsenc", "_hsmi"
+}
+
 class TextProcessor:
     """Utility class for processing and analyzing text content"""
     
@@ -80,6 +86,42 @@ class TextProcessor:
         except:
             return "unknown"
     
+    @staticmethod
+    def canonicalize_url(url: str) -> str:
+        """
+        Normalize a URL so links to the same page compare equal
+        
+        Folds http/https, host case, a leading "www.", default ports, trailing
+        slashes, fragments, tracking parameters and query parameter order.
+        
+        Args:
+            url: URL to normalize
+            
+        Returns:
+            Canonical form of the URL; non-HTTP URLs are returned stripped but otherwise unchanged
+        """
+        url = url.strip()
+        try:
+            parsed = urlsplit(url)
+            port = parsed.port
+        except ValueError:
+            return url
+        if parsed.scheme.lower() not in ("http", "https") or not parsed.hostname:
+            return url
+        
+        host = parsed.hostname.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        if port and port not in (80, 443):
+            host = f"{host}:{port}"
+        
+        path = re.sub(r"/{2,}", "/", parsed.path).rstrip("/") or "/"
+        query = sorted(
+            (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+        )
+        return urlunsplit(("https", host, path, urlencode(query), ""))
+    
     @staticmethod
     def is_academic_source(url: str) -> bool:
         """Check if URL appears to be from an academic source"""
@@ -0,0 +1,27 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+
+from tim_urban_agent.config import config
+from tim_urban_agent.utils.circuit_breaker import BREAKERS, CircuitBreaker
+from tim_urban_agent.utils.rate_limiter import RateLimiter, anthropic_limiter, openai_image_limiter
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep on-disk caches created during tests out of the user's cache directory"""
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path / "cache"))
+
+@pytest.fixture(autouse=True)
+def unlimited_rate_limits(monkeypatch):
+    """Start every test with fresh, unlimited provider budgets"""
+    for limiter in (anthropic_limiter, openai_image_limiter):
+        for name, value in vars(RateLimiter(limiter.name, 0)).items():
+            monkeypatch.setattr(limiter, name, value)
+
+@pytest.fixture(autouse=True)
+def closed_circuit_breakers(monkeypatch):
+    """Start every test with all provider breakers closed and empty"""
+    for breaker in BREAKERS:
+        for name, value in vars(CircuitBreaker(breaker.name)).items():
+            monkeypatch.setattr(breaker, name, value)
@@ -3,9 +3,43 @@ Test cases for the main Tim Urban Agent
 """
 import pytest
 import asyncio
-from unittest.mock import Mock, patch
+import time
+from unittest.mock import AsyncMock, Mock, patch
 
 from tim_urban_agent.agent import TimUrbanResearchAgent
+from tim_urban_agent.config import config
+from tim_urban_agent.utils.cache import DiskCache, TieredCache, TTLCache
+from tim_urban_agent.utils.deadline import Deadline
+
+RESEARCH_DATA = {
+    "primary_web": {"articles": []},
+    "youtube": {"videos": []},
+    "related": [],
+    "sources": [{"type": "web", "title": "Test", "url": "https://example.com", "snippet": ""}],
+    "depth": 3
+}
+
+def mock_pipeline(agent, delay=0.0):
+    """Replace every pipeline stage of the agent with fast async fakes and disable caching"""
+    async def write_post(structure, analysis, cartoons, style, draft=False, on_fallback=None):
+        await asyncio.sleep(delay)
+        return "Test blog post content"
+    
+    async def draw_cartoons(concepts, cache_hits=None, style="detailed", timeout=None, degraded=None, refresh=False):
+        await asyncio.sleep(delay)
+        return [{"concept": c, "data": "png", "description": c} for c in concepts]
+    
+    agent.result_cache = None
+    agent.phase_cache = None
+    agent._gather_research = AsyncMock(return_value=RESEARCH_DATA)
+    agent.research_aggregator.analyze_research = AsyncMock(
+        return_value={"topic": "test", "summary": "Test summary", "key_points": []}
+    )
+    agent.blog_generator.create_structure = AsyncMock(
+        return_value={"title": "Test Title", "sections": [], "cartoon_concepts": ["A", "B"]}
+    )
+    agent.blog_generator.generate_full_post = AsyncMock(side_effect=write_post)
+    agent._generate_cartoons = AsyncMock(side_effect=draw_cartoons)
 
 class TestTimUrbanResearchAgent:
     """Test cases for the main research agent"""
@@ -58,6 +92,139 @@ class TestTimUrbanResearchAgent:
             assert "sources" in result
             assert result["depth"] == 2
     
+    @pytest.mark.asyncio
+    async def test_gather_research_fetches_each_page_once(self):
+        """Test that pages returned by several queries are fetched and listed once"""
+        agent = TimUrbanResearchAgent()
+        agent.web_search.serp_api_key = None
+        
+        with patch.object(agent.web_search, '_extract_article_content', return_value="Content") as mock_extract, \
+             patch.object(agent.youtube_tool, 'execute', AsyncMock(return_value={"videos": []})):
+            result = await agent._gather_research("test topic", depth=2)
+        
+        # The related queries' simulated results repeat the primary query's first two pages
+        assert mock_extract.await_count == 4
+        assert result["fetch_stats"] == {"requested": 8, "fetched": 4, "skipped": 0, "saved": 4}
+        assert [source["url"] for source in result["sources"]] == [
+            f"https://example.com/article-{i}" for i in range(1, 5)
+        ]
+        assert all(len(related["articles"]) == 2 for related in result["related"])
+    
+    @pytest.mark.asyncio
+    async def test_adaptive_gathering_stops_when_pages_repeat(self):
+        """Test that adaptive mode stops fetching once new pages add nothing new"""
+        agent = TimUrbanResearchAgent()
+        agent.web_search.serp_api_key = None
+        
+        with patch.object(agent.web_search, '_extract_article_content', return_value="the same words on every page") as mock_extract, \
+             patch.object(agent.youtube_tool, 'execute', AsyncMock(return_value={"videos": []})), \
+             patch("tim_urban_agent.agent.config.ADAPTIVE_FETCH_CONCURRENCY", 1), \
+             patch("tim_urban_agent.utils.novelty.config.ADAPTIVE_MIN_DOCUMENTS", 2), \
+             patch("tim_urban_agent.utils.novelty.config.ADAPTIVE_NOVELTY_WINDOW", 2):
+            result = await agent._gather_research("test topic", depth=5, mode="adaptive")
+        
+        # The first page is all new, the second adds nothing: mean novelty 0.5, then 0.0
+        assert mock_extract.await_count == 3
+        assert result["gathering"]["stop_reason"] == "novelty"
+        assert result["gathering"]["novelty"] == [1.0, 0.0, 0.0]
+        assert result["fetch_stats"]["skipped"] == 7
+        assert len(result["sources"]) == 3
+    
+    @pytest.mark.asyncio
+    async def test_fast_mode_writes_a_snippet_draft(self):
+        """Test that fast mode gathers snippets only and writes a draft with simple cartoons"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        
+        result = await agent.research_topic("black holes", mode="fast")
+        
+        assert agent._gather_research.await_args.args == ("black holes", 3, "fast")
+        assert agent.blog_generator.create_structure.await_args.kwargs == {"draft": True}
+        assert agent.blog_generator.generate_full_post.await_args.kwargs["draft"] is True
+        assert agent._generate_cartoons.await_args.kwargs["style"] == "simple"
+        assert result["metrics"]["research_mode"] == "fast"
+        assert result["metrics"]["latency_target"] == config.FAST_LATENCY_TARGET
+        assert result["metrics"]["latency_target_met"] is True
+    
+    @pytest.mark.asyncio
+    async def test_time_budget_degrades_slow_phases(self):
+        """Test that a run under a tight budget falls back instead of waiting and flags it"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        
+        async def slow_post(structure, analysis, cartoons, style, draft=False, on_fallback=None):
+            await asyncio.sleep(1)
+            return "Too late"
+        agent.blog_generator.generate_full_post = AsyncMock(side_effect=slow_post)
+        agent.blog_generator.create_structure = AsyncMock(return_value={
+            "title": "Test Title", "subtitle": "Test Subtitle", "sections": [], "cartoon_concepts": ["A"]
+        })
+        
+        start = time.perf_counter()
+        result = await agent.research_topic("black holes", time_budget=0.2)
+        
+        assert time.perf_counter() - start < 0.5
+        assert "Too late" not in result["blog_post"]
+        assert agent._generate_cartoons.await_args.kwargs["style"] == "placeholder"
+        assert result["metrics"]["degraded"] == ["cartoons_placeholder", "blog_post_timeout"]
+        assert result["metrics"]["time_budget"] == 0.2
+        assert result["metrics"]["deadline_met"] is False
+    
+    @pytest.mark.asyncio
+    async def test_short_deadline_gathers_snippets_only(self):
+        """Test that gathering skips page and transcript fetches when the budget is short"""
+        agent = TimUrbanResearchAgent()
+        agent.web_search.serp_api_key = None
+        youtube = AsyncMock(return_value={"videos": []})
+        
+        with patch.object(agent.web_search, '_extract_article_content') as mock_extract, \
+             patch.object(agent.youtube_tool, 'execute', youtube):
+            result = await agent._gather_research("test topic", depth=2, deadline=Deadline(5))
+        
+        assert mock_extract.await_count == 0
+        assert youtube.await_args.kwargs["fetch_transcripts"] is False
+        assert result["degraded"] == ["research_snippets_only"]
+        assert len(result["sources"]) == 4
+    
+    @pytest.mark.asyncio
+    async def test_provider_fallbacks_mark_research_degraded(self):
+        """Test that simulated results from open breakers are flagged so research isn't cached"""
+        agent = TimUrbanResearchAgent()
+        web = AsyncMock(return_value={"articles": [], "fallback": True})
+        youtube = AsyncMock(return_value={"videos": [], "fallback": True})
+        
+        with patch.object(agent.web_search, 'execute', web), \
+             patch.object(agent.youtube_tool, 'execute', youtube):
+            result = await agent._gather_research("test topic", depth=1)
+        
+        assert result["degraded"] == ["serpapi_fallback", "youtube_fallback"]
+    
+    @pytest.mark.asyncio
+    async def test_cartoon_timeout_uses_placeholder(self):
+        """Test that a cartoon not ready in time is replaced by a placeholder"""
+        agent = TimUrbanResearchAgent()
+        agent.phase_cache = None
+        degraded = []
+        
+        async def fake_execute(concept, style):
+            if style == "detailed":
+                await asyncio.sleep(1)
+            return {"image_data": style, "method": style}
+        
+        with patch.object(agent.image_generator, 'execute', side_effect=fake_execute):
+            cartoons = await agent._generate_cartoons(["A", "B"], timeout=0.05, degraded=degraded)
+        
+        assert [cartoon["data"] for cartoon in cartoons] == ["placeholder", "placeholder"]
+        assert degraded == ["cartoons_timeout", "cartoons_timeout"]
+    
+    @pytest.mark.asyncio
+    async def test_unknown_mode_is_rejected(self):
+        """Test that research_topic validates the research mode"""
+        agent = TimUrbanResearchAgent()
+        
+        with pytest.raises(ValueError):
+            await agent.research_topic("test topic", mode="thorough")
+    
     @pytest.mark.asyncio
     async def test_generate_related_queries(self):
         """Test related query generation"""
@@ -69,5 +236,277 @@ class TestTimUrbanResearchAgent:
         assert len(queries) > 0
         assert all("machine learning" in query.lower() for query in queries)
 
+    @pytest.mark.asyncio
+    async def test_generate_cartoons_concurrently(self):
+        """Test that cartoons are generated in parallel, in order, with failures isolated"""
+        agent = TimUrbanResearchAgent()
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def fake_execute(concept, style):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.1)
+            in_flight -= 1
+            if concept == "broken":
+                raise RuntimeError("image API exploded")
+            return {"image_data": f"png:{concept}", "description": concept}
+        
+        concepts = ["first", "broken", "third", "fourth"]
+        with patch.object(agent.image_generator, 'execute', side_effect=fake_execute), \
+             patch("tim_urban_agent.agent.config.CARTOON_CONCURRENCY", 3):
+            start = time.perf_counter()
+            cartoons = await agent._generate_cartoons(concepts)
+            elapsed = time.perf_counter() - start
+        
+        assert [cartoon["concept"] for cartoon in cartoons] == ["first", "third", "fourth"]
+        assert cartoons[0]["data"] == "png:first"
+        assert max_in_flight == 3
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_cartoons_overlap_full_post(self):
+        """Test that image generation runs alongside full-post generation"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent, delay=0.2)
+        
+        start = time.perf_counter()
+        result = await agent.research_topic("black holes")
+        elapsed = time.perf_counter() - start
+        
+        assert elapsed < 0.35
+        assert result["metrics"]["cartoon_count"] == 2
+        # The full post is written from concept stubs, before any image exists
+        planned = agent.blog_generator.generate_full_post.call_args.args[2]
+        assert planned == [{"concept": "A"}, {"concept": "B"}]
+        assert result["metrics"]["critical_path"][:3] == ["research", "analysis", "structure"]
+        assert set(result["metrics"]["phase_timings"]) == {
+            "research", "analysis", "structure", "cartoons", "blog_post"
+        }
+
+    @pytest.mark.asyncio
+    async def test_result_cache(self, tmp_path):
+        """Test that repeated requests are served from the result cache unless refreshed"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        agent.result_cache = DiskCache(str(tmp_path), ttl=60, max_bytes=10 * 1024 * 1024)
+        
+        first = await agent.research_topic("Black Holes", depth=2)
+        second = await agent.research_topic("  black holes ", depth=2)
+        assert agent._gather_research.await_count == 1
+        assert first["metrics"]["result_cache_hit"] is False
+        assert second["metrics"]["result_cache_hit"] is True
+        assert second["blog_post"] == first["blog_post"]
+        
+        # A different argument set or an explicit refresh recomputes
+        await agent.research_topic("black holes", depth=3)
+        await agent.research_topic("black holes", depth=2, refresh=True)
+        assert agent._gather_research.await_count == 3
+        
+        # A fresh agent (e.g. after a restart) reads the persisted result
+        restarted = TimUrbanResearchAgent()
+        mock_pipeline(restarted)
+        restarted.result_cache = DiskCache(str(tmp_path), ttl=60, max_bytes=10 * 1024 * 1024)
+        result = await restarted.research_topic("black holes", depth=2)
+        assert result["metrics"]["result_cache_hit"] is True
+        assert restarted._gather_research.await_count == 0
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_are_coalesced(self):
+        """Test that concurrent identical requests share one pipeline run"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent, delay=0.05)
+        
+        results = await asyncio.gather(
+            agent.research_topic("Black Holes"),
+            agent.research_topic("black holes"),
+            agent.research_topic("black holes", style="technical")
+        )
+        
+        assert results[0] is results[1]
+        assert agent._gather_research.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tracked_jobs_are_not_coalesced(self):
+        """Test that requests with their own job ID or progress callback run separately"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent, delay=0.05)
+        events = []
+        
+        async def on_progress(phase, status):
+            events.append((phase, status))
+        
+        results = await asyncio.gather(
+            agent.research_topic("black holes"),
+            agent.research_topic("black holes", job_id="job-1"),
+            agent.research_topic("black holes", on_progress=on_progress)
+        )
+        
+        assert results[1]["job_id"] == "job-1"
+        assert len({result["job_id"] for result in results}) == 3
+        assert ("blog_post", "completed") in events
+        assert agent._gather_research.await_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_style_variant_reuses_research_and_analysis(self):
+        """Test that phase memoization skips style-independent work"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        agent.phase_cache = TieredCache(TTLCache(max_entries=32, ttl=60))
+        # Use the real cartoon phase so per-concept memoization is exercised
+        del agent._generate_cartoons
+        agent.image_generator.execute = AsyncMock(
+            return_value={"image_data": "png", "method": "dalle", "description": "cartoon"}
+        )
+        
+        await agent.research_topic("black holes", style="humorous")
+        result = await agent.research_topic("black holes", style="technical")
+        
+        assert agent._gather_research.await_count == 1
+        assert agent.research_aggregator.analyze_research.await_count == 1
+        assert agent.blog_generator.create_structure.await_count == 2
+        assert agent.blog_generator.generate_full_post.await_count == 2
+        assert agent.image_generator.execute.await_count == 2
+        assert result["metrics"]["phase_cache_hits"].count("cartoon") == 2
+        assert {"research", "analysis"} <= set(result["metrics"]["phase_cache_hits"])
+    
+    @pytest.mark.asyncio
+    async def test_fallback_outputs_are_not_memoized(self):
+        """Test that fallback structures from failed LLM calls are recomputed next time"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        agent.phase_cache = TieredCache(TTLCache(max_entries=32, ttl=60))
+        agent.blog_generator.create_structure = AsyncMock(
+            return_value={"title": "Fallback", "sections": [], "cartoon_concepts": [], "fallback": True}
+        )
+        
+        await agent.research_topic("black holes", include_cartoons=False)
+        await agent.research_topic("black holes", include_cartoons=False, refresh=True)
+        
+        assert agent.blog_generator.create_structure.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_recomputes_memoized_phases(self):
+        """Test that refresh skips phase-cache reads but still refills the cache"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        agent.phase_cache = TieredCache(TTLCache(max_entries=32, ttl=60))
+        
+        await agent.research_topic("black holes", include_cartoons=False)
+        refreshed = await agent.research_topic("black holes", include_cartoons=False, refresh=True)
+        again = await agent.research_topic("black holes", style="technical", include_cartoons=False)
+        
+        assert refreshed["metrics"]["phase_cache_hits"] == []
+        assert agent._gather_research.await_count == 2
+        assert {"research", "analysis"} <= set(again["metrics"]["phase_cache_hits"])
+    
+    @pytest.mark.asyncio
+    async def test_fallback_posts_and_cartoons_are_not_cached(self, tmp_path):
+        """Test that results patched with a canned post or failed cartoons skip the result cache"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        agent.result_cache = DiskCache(str(tmp_path), ttl=60, max_bytes=10 * 1024 * 1024)
+        del agent._generate_cartoons  # draw through the real method
+        
+        async def canned_post(structure, analysis, cartoons, style, draft=False, on_fallback=None):
+            on_fallback()
+            return "Canned post"
+        
+        agent.blog_generator.generate_full_post = AsyncMock(side_effect=canned_post)
+        agent.image_generator.execute = AsyncMock(
+            return_value={"image_data": "png", "method": "placeholder", "concept": "A"}
+        )
+        
+        result = await agent.research_topic("black holes")
+        again = await agent.research_topic("black holes")
+        
+        assert set(result["metrics"]["degraded"]) == {"cartoons_failed", "blog_post_fallback"}
+        assert again["metrics"]["result_cache_hit"] is False
+        assert agent._gather_research.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_job_resumes_from_checkpoint(self):
+        """Test that re-invoking a failed job skips the phases it already completed"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        
+        async def failing_post(structure, analysis, cartoons, style, draft=False, on_fallback=None):
+            # The concurrent cartoon phase still finishes and is checkpointed
+            raise RuntimeError("API down")
+        
+        agent.blog_generator.generate_full_post = AsyncMock(side_effect=failing_post)
+        
+        with pytest.raises(RuntimeError):
+            await agent.research_topic("black holes", job_id="job-1")
+        assert agent._gather_research.await_count == 1
+        
+        # A fresh agent (e.g. after a crash) picks up where the job stopped
+        resumed = TimUrbanResearchAgent()
+        mock_pipeline(resumed)
+        result = await resumed.research_topic("black holes", job_id="job-1")
+        
+        assert result["job_id"] == "job-1"
+        assert set(result["metrics"]["resumed_phases"]) == {"research", "analysis", "structure", "cartoons"}
+        assert resumed._gather_research.await_count == 0
+        assert resumed.blog_generator.generate_full_post.await_count == 1
+        
+        # Success clears the checkpoints, so the same ID now runs from scratch
+        assert resumed.checkpoints.load("job-1") == {}
+        other = await resumed.research_topic("black holes", job_id="job-1", refresh=True)
+        assert other["metrics"]["resumed_phases"] == []
+
+    @pytest.mark.asyncio
+    async def test_only_resumable_jobs_are_checkpointed(self):
+        """Test that untracked runs and fallback outputs leave no checkpoints behind"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent)
+        agent.blog_generator.generate_full_post = AsyncMock(side_effect=RuntimeError("API down"))
+        
+        with pytest.raises(RuntimeError):
+            await agent.research_topic("black holes")
+        assert not agent.checkpoints.directory.exists() or list(agent.checkpoints.directory.iterdir()) == []
+        
+        agent.blog_generator.create_structure = AsyncMock(
+            return_value={"title": "Fallback", "sections": [], "cartoon_concepts": [], "fallback": True}
+        )
+        with pytest.raises(RuntimeError):
+            await agent.research_topic("black holes", job_id="job-2")
+        assert set(agent.checkpoints.load("job-2")) == {"job", "research", "analysis", "cartoons"}
+    
+    @pytest.mark.asyncio
+    async def test_research_many(self):
+        """Test bounded batch concurrency, streaming callbacks and per-topic failure isolation"""
+        agent = TimUrbanResearchAgent()
+        mock_pipeline(agent, delay=0.05)
+        in_flight = 0
+        max_in_flight = 0
+        research_topic = agent.research_topic
+        
+        async def tracked_research(topic, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                if topic == "broken":
+                    raise RuntimeError("boom")
+                return await research_topic(topic, **kwargs)
+            finally:
+                in_flight -= 1
+        
+        agent.research_topic = tracked_research
+        streamed = []
+        
+        async def on_result(topic, result):
+            streamed.append(topic)
+        
+        topics = ["a", "b", "broken", "c", "d"]
+        results = await agent.research_many(topics, max_concurrency=2, on_result=on_result)
+        
+        assert [result["topic"] for result in results] == topics
+        assert results[2] == {"topic": "broken", "error": "boom"}
+        assert sorted(streamed) == sorted(topics)
+        assert max_in_flight == 2
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,126 @@
+"""
+Test cases for Tim Urban Agent content generators
+"""
+import pytest
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+from anthropic import APIConnectionError, RateLimitError
+
+from tim_urban_agent.generators.blog_generator import BlogGenerator
+from tim_urban_agent.utils.circuit_breaker import anthropic_breaker
+from tim_urban_agent.utils.rate_limiter import anthropic_limiter
+
+ANALYSIS = {
+    "topic": "black holes",
+    "summary": "Black holes are regions of spacetime where gravity wins.",
+    "key_points": ["Nothing escapes past the event horizon"],
+    "complexity": "high"
+}
+
+def make_message(text):
+    """Build a fake Anthropic message response"""
+    message = Mock()
+    message.content = [Mock(text=text)]
+    return message
+
+class TestBlogGenerator:
+    """Test cases for BlogGenerator"""
+    
+    @pytest.mark.asyncio
+    async def test_create_structure_retries_transient_errors(self):
+        """Test that connection errors are retried before falling back"""
+        generator = BlogGenerator()
+        error = APIConnectionError(request=httpx.Request("POST", "https://api.anthropic.com"))
+        generator.anthropic = Mock()
+        generator.anthropic.messages.create = AsyncMock(
+            side_effect=[error, make_message("Title: Gravity Always Wins\nCARTOON: A stick figure falling in")]
+        )
+        
+        with patch("tim_urban_agent.generators.blog_generator.config.RETRY_BASE_DELAY", 0.01):
+            structure = await generator.create_structure(ANALYSIS, "humorous")
+        
+        assert structure["title"] == "Gravity Always Wins"
+        assert structure["cartoon_concepts"][0] == "A stick figure falling in"
+        assert generator.anthropic.messages.create.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_draft_post_is_shorter(self):
+        """Test that a draft post asks for fewer tokens and a shorter target length"""
+        generator = BlogGenerator()
+        generator.anthropic = Mock()
+        generator.anthropic.messages.create = AsyncMock(return_value=make_message("A quick draft"))
+        structure = generator._fallback_structure(ANALYSIS)
+        
+        with patch("tim_urban_agent.generators.blog_generator.config.FAST_POST_MAX_TOKENS", 900):
+            await generator.generate_full_post(structure, ANALYSIS, [], "humorous", draft=True)
+            await generator.generate_full_post(structure, ANALYSIS, [], "humorous")
+        
+        draft_call, full_call = generator.anthropic.messages.create.call_args_list
+        assert draft_call.kwargs["max_tokens"] == 900
+        assert "about 600 words" in draft_call.kwargs["messages"][0]["content"]
+        assert full_call.kwargs["max_tokens"] == 4000
+        assert "2000+ words" in full_call.kwargs["messages"][0]["content"]
+    
+    @pytest.mark.asyncio
+    async def test_llm_calls_overlap(self):
+        """Test that concurrent generations don't block each other"""
+        generator = BlogGenerator()
+        
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.2)
+            return make_message("Title: Overlap")
+        
+        generator.anthropic = Mock()
+        generator.anthropic.messages.create = AsyncMock(side_effect=slow_create)
+        
+        start = time.perf_counter()
+        structures = await asyncio.gather(*(
+            generator.create_structure(ANALYSIS, "humorous") for _ in range(5)
+        ))
+        
+        assert all(structure["title"] == "Overlap" for structure in structures)
+        assert time.perf_counter() - start < 0.6
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_honors_retry_after(self):
+        """Test that a 429 pauses the shared limiter for Retry-After and the call then succeeds"""
+        generator = BlogGenerator()
+        response = httpx.Response(
+            429,
+            headers={"retry-after": "0.2"},
+            request=httpx.Request("POST", "https://api.anthropic.com")
+        )
+        error = RateLimitError("rate limited", response=response, body=None)
+        generator.anthropic = Mock()
+        generator.anthropic.messages.create = AsyncMock(
+            side_effect=[error, make_message("Title: Patience")]
+        )
+        
+        with patch("tim_urban_agent.generators.blog_generator.config.RETRY_BASE_DELAY", 0.01):
+            start = time.perf_counter()
+            structure = await generator.create_structure(ANALYSIS, "humorous")
+            elapsed = time.perf_counter() - start
+        
+        assert structure["title"] == "Patience"
+        assert elapsed >= 0.2
+        assert anthropic_limiter.stats["rate_limited"] == 1
+        assert anthropic_limiter.stats["requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_to_fallback(self):
+        """Test that an open Anthropic breaker goes straight to the fallback structure"""
+        generator = BlogGenerator()
+        generator.anthropic = Mock()
+        generator.anthropic.messages.create = AsyncMock(return_value=make_message("Title: Unused"))
+        anthropic_breaker._open()
+        
+        structure = await generator.create_structure(ANALYSIS, "humorous")
+        
+        assert structure["fallback"] is True
+        assert generator.anthropic.messages.create.await_count == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -4,11 +4,65 @@ Test cases for Tim Urban Agent tools
 import pytest
 import asyncio
 import os
-from unittest.mock import Mock, patch
+import threading
+import time
+from unittest.mock import AsyncMock, Mock, patch
 
 from tim_urban_agent.tools.web_search_tool import WebSearchTool
 from tim_urban_agent.tools.youtube_tool import YouTubeTool
 from tim_urban_agent.tools.image_generation_tool import ImageGenerationTool
+from tim_urban_agent.config import config
+from tim_urban_agent.utils.cache import DiskCache
+from tim_urban_agent.utils.circuit_breaker import CircuitBreaker, serpapi_breaker
+from tim_urban_agent.utils.fetch_registry import FetchRegistry
+from tim_urban_agent.utils.http_session import session_manager
+
+class FakeStream:
+    """Minimal stand-in for an aiohttp response body stream"""
+    
+    def __init__(self, body):
+        self.body = body
+        self.bytes_read = 0
+    
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            chunk = self.body[start:start + size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+class FakeResponse:
+    """Minimal stand-in for an aiohttp response"""
+    
+    def __init__(self, status=200, body="", headers=None, data=None):
+        self.status = status
+        self.headers = headers or {}
+        self.charset = "utf-8"
+        self.content = FakeStream(body.encode("utf-8"))
+        self._body = body
+        self._data = data
+    
+    async def text(self):
+        return self._body
+    
+    async def json(self):
+        return self._data
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+class FakeSession:
+    """Minimal stand-in for an aiohttp session that replays queued responses"""
+    
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+    
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return self.responses.pop(0)
 
 class TestWebSearchTool:
     """Test cases for WebSearchTool"""
@@ -45,6 +99,313 @@ class TestWebSearchTool:
         
         await tool.close()
 
+    @pytest.mark.asyncio
+    async def test_article_extraction_is_concurrent_and_ordered(self):
+        """Test that articles are fetched concurrently but keep search-rank order"""
+        tool = WebSearchTool()
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_extract(url):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # Later-ranked results finish first
+            await asyncio.sleep(0.05 / int(url.rsplit("-", 1)[1]))
+            in_flight -= 1
+            return f"content for {url}"
+
+        with patch.object(tool, '_extract_article_content', side_effect=fake_extract), \
+             patch("tim_urban_agent.tools.web_search_tool.config.WEB_FETCH_PER_HOST_CONCURRENCY", 3):
+            result = await tool.execute("machine learning", max_results=5)
+
+        urls = [article["url"] for article in result["articles"]]
+        assert urls == [f"https://example.com/article-{i}" for i in range(1, 6)]
+        assert max_in_flight == 3
+
+        await tool.close()
+    
+    @pytest.mark.asyncio
+    async def test_hedged_fetch_returns_first_good_articles(self):
+        """Test that hedging over-fetches, skips empty pages and cancels stragglers"""
+        tool = WebSearchTool()
+        cancelled = []
+        
+        async def fake_extract(url):
+            rank = int(url.rsplit("-", 1)[1])
+            if rank == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append(url)
+                    raise
+            await asyncio.sleep(0.01)
+            return "" if rank == 2 else f"content for {url}"
+        
+        with patch.object(tool, '_extract_article_content', side_effect=fake_extract), \
+             patch("tim_urban_agent.tools.web_search_tool.config.WEB_FETCH_PER_HOST_CONCURRENCY", 5), \
+             patch("tim_urban_agent.tools.web_search_tool.config.WEB_FETCH_HEDGE_EXTRA", 2):
+            start = time.perf_counter()
+            result = await tool.execute("machine learning", max_results=3)
+            elapsed = time.perf_counter() - start
+        
+        urls = [article["url"] for article in result["articles"]]
+        assert urls == [f"https://example.com/article-{i}" for i in (3, 4, 5)]
+        assert cancelled == ["https://example.com/article-1"]
+        assert tool.fetch_stats["cancelled"] == 1
+        assert elapsed < 0.5
+    
+    @pytest.mark.asyncio
+    async def test_snippet_only_search_skips_page_downloads(self):
+        """Test that fetch_pages=False returns snippet-only articles without fetching"""
+        tool = WebSearchTool()
+        
+        with patch.object(tool, '_extract_article_content') as mock_extract:
+            result = await tool.execute("machine learning", max_results=3, fetch_pages=False)
+        
+        assert mock_extract.await_count == 0
+        assert len(result["articles"]) == 3
+        assert all(article["content"] == "" and article["snippet"] for article in result["articles"])
+    
+    @pytest.mark.asyncio
+    async def test_tools_share_http_session(self):
+        """Test that all tool instances reuse the process-wide HTTP session"""
+        first, second = WebSearchTool(), WebSearchTool()
+        
+        session = await first._get_session()
+        assert await second._get_session() is session
+        
+        # Closing a tool leaves the shared session open for everyone else
+        await first.close()
+        assert not session.closed
+        
+        await session_manager.close()
+        assert session.closed
+        assert await second._get_session() is not session
+        
+        await session_manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_page_cache_revalidation(self, tmp_path):
+        """Test that cached pages are served fresh and revalidated with ETags once stale"""
+        tool = WebSearchTool()
+        tool.page_cache = DiskCache(str(tmp_path), ttl=60, max_bytes=1024 * 1024)
+        url = "https://example.com/page"
+        session = FakeSession([
+            FakeResponse(200, "<article>Original text</article>", {"ETag": '"v1"'}),
+            FakeResponse(304)
+        ])
+        
+        with patch.object(tool, '_get_session', return_value=session):
+            assert await tool._extract_article_content(url) == "Original text"
+            # Fresh hit: no network round trip
+            assert await tool._extract_article_content(url) == "Original text"
+            assert len(session.requests) == 1
+            
+            # Stale hit: conditional request answered with 304
+            tool.page_cache.ttl = 0
+            assert await tool._extract_article_content(url) == "Original text"
+            assert session.requests[1][1]["headers"]["If-None-Match"] == '"v1"'
+        
+        assert tool.page_cache.stats["hits"] == 1
+        assert tool.page_cache.stats["refreshed"] == 1
+        assert tool.page_cache.stats["stale"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_failed_page_cache_write_keeps_content(self, tmp_path):
+        """Test that a page is still returned when caching it fails"""
+        tool = WebSearchTool()
+        tool.page_cache = DiskCache(str(tmp_path), ttl=60, max_bytes=1024 * 1024)
+        session = FakeSession([FakeResponse(200, "<article>Original text</article>")])
+        
+        with patch.object(tool, '_get_session', return_value=session), \
+             patch.object(tool.page_cache, 'set', side_effect=OSError("disk full")):
+            assert await tool._extract_article_content("https://example.com/page") == "Original text"
+        
+        assert tool.fetch_stats["fetched"] == 1
+        assert tool.fetch_stats["dropped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_search_cache_normalizes_queries(self):
+        """Test that SerpAPI results are cached under a case/whitespace-folded key"""
+        tool = WebSearchTool()
+        tool.serp_api_key = "test-key"
+        data = {"organic_results": [{"title": "Black Holes", "link": "https://example.com/bh", "snippet": "..."}]}
+        session = FakeSession([FakeResponse(data=data)])
+        
+        with patch.object(tool, '_get_session', return_value=session):
+            first = await tool._search_web("Black Holes", 5)
+            second = await tool._search_web("  black   HOLES ", 5)
+        
+        assert first == second
+        assert len(session.requests) == 1
+        assert tool.search_cache.memory.stats["hits"] == 1
+        assert tool._search_cache_key("Black Holes", 5) != tool._search_cache_key("Black Holes", 3)
+
+    @pytest.mark.asyncio
+    async def test_extraction_skips_non_html_and_caps_bytes(self):
+        """Test the content-type gate and the streaming byte limit"""
+        tool = WebSearchTool()
+        tool.page_cache = None
+        tool.extractor.max_bytes = 1000
+        tool.extractor.READ_CHUNK_SIZE = 100
+        pdf = FakeResponse(200, "%PDF-1.7", {"Content-Type": "application/pdf"})
+        huge = FakeResponse(200, "<main>" + "word " * 100000 + "</main>", {"Content-Type": "text/html"})
+        session = FakeSession([pdf, huge])
+        
+        with patch.object(tool, '_get_session', return_value=session):
+            assert await tool._extract_article_content("https://example.com/paper.pdf") == ""
+            content = await tool._extract_article_content("https://example.com/huge")
+        
+        assert pdf.content.bytes_read == 0
+        assert huge.content.bytes_read == 1000
+        assert content.startswith("word")
+
+    @pytest.mark.asyncio
+    async def test_identical_searches_are_coalesced(self):
+        """Test that concurrent identical searches share one search and fetch"""
+        tool = WebSearchTool()
+        
+        with patch.object(tool, '_search_web', wraps=tool._search_web) as mock_search, \
+             patch.object(tool, '_extract_article_content', return_value="Shared content"):
+            first, second = await asyncio.gather(
+                tool.execute("Black Holes", max_results=2),
+                tool.execute("black holes", max_results=2)
+            )
+        
+        assert first is second
+        assert mock_search.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_registry_fetches_each_page_once_across_queries(self):
+        """Test that searches sharing a fetch registry don't refetch URL variants"""
+        tool = WebSearchTool()
+        registry = FetchRegistry()
+        
+        def results(query, max_results):
+            return [
+                {"title": "A", "url": "https://www.example.com/a/?utm_source=x", "snippet": ""},
+                {"title": "B", "url": f"https://example.com/{query}", "snippet": ""}
+            ]
+        
+        with patch.object(tool, '_search_web', side_effect=results), \
+             patch.object(tool, '_extract_article_content', return_value="Page content") as mock_extract:
+            first, second = await asyncio.gather(
+                tool.execute("one", registry=registry),
+                tool.execute("two", registry=registry)
+            )
+        
+        assert len(first["articles"]) == len(second["articles"]) == 2
+        assert mock_extract.await_count == 3
+        assert registry.metrics() == {"requested": 4, "fetched": 3, "skipped": 0, "saved": 1}
+    
+    @pytest.mark.asyncio
+    async def test_runs_share_searches_but_not_registries(self):
+        """Test that concurrent runs share one SerpAPI call but fetch through their own registries"""
+        tool = WebSearchTool()
+        tool.serp_api_key = "test-key"
+        first, second = FetchRegistry(), FetchRegistry()
+        data = {"organic_results": [
+            {"title": f"Result {i}", "link": f"https://example.com/{i}", "snippet": "..."} for i in range(2)
+        ]}
+        
+        async def serpapi(query, max_results):
+            await asyncio.sleep(0.01)
+            return data
+        
+        with patch.object(tool, '_query_serpapi', side_effect=serpapi) as mock_query, \
+             patch.object(tool, '_extract_article_content', return_value="Page content"):
+            await asyncio.gather(
+                tool.execute("black holes", max_results=2, registry=first, fetch_pages=False),
+                tool.execute("Black Holes", max_results=2, registry=second, fetch_pages=False)
+            )
+            await asyncio.gather(
+                tool.execute("dark matter", max_results=2, registry=first),
+                tool.execute("dark matter", max_results=2, registry=second)
+            )
+        
+        assert mock_query.await_count == 2
+        assert tool._search_inflight.stats["coalesced"] == 2
+        assert first.stats["requested"] == second.stats["requested"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_throttled_host_is_retried_then_dropped(self):
+        """Test that 429/503 responses are retried after Retry-After and counted separately from drops"""
+        tool = WebSearchTool()
+        tool.page_cache = None
+        session = FakeSession([
+            FakeResponse(429, headers={"Retry-After": "0.1"}),
+            FakeResponse(200, "<article>Worth the wait</article>"),
+            FakeResponse(503),
+            FakeResponse(503)
+        ])
+        
+        with patch.object(tool, '_get_session', return_value=session), \
+             patch("tim_urban_agent.tools.web_search_tool.config.WEB_FETCH_MAX_ATTEMPTS", 2), \
+             patch("tim_urban_agent.tools.web_search_tool.config.RETRY_BASE_DELAY", 0.01):
+            start = time.perf_counter()
+            assert await tool._fetch_with_limits("https://reddit.com/r/space/1") == "Worth the wait"
+            assert time.perf_counter() - start >= 0.1
+            assert await tool._fetch_with_limits("https://busy.example.com/post") == ""
+        
+        assert tool.fetch_stats == {"fetched": 1, "throttled": 3, "retried": 2, "dropped": 1, "cancelled": 0}
+
+    @pytest.mark.asyncio
+    async def test_idle_host_limits_are_evicted(self):
+        """Test that per-host limits are bounded, dropping only idle least recently used hosts"""
+        tool = WebSearchTool()
+        release = asyncio.Event()
+        
+        async def extract(url):
+            if "busy" in url:
+                await release.wait()
+            return "Page content"
+        
+        with patch.object(tool, '_extract_article_content', side_effect=extract), \
+             patch("tim_urban_agent.tools.web_search_tool.config.WEB_FETCH_MAX_TRACKED_HOSTS", 2):
+            busy = asyncio.create_task(tool._fetch_with_limits("https://busy.com/a"))
+            await asyncio.sleep(0)
+            for host in ("a.com", "b.com", "c.com"):
+                await tool._fetch_with_limits(f"https://{host}/page")
+            
+            assert list(tool._hosts) == ["busy.com", "c.com"]
+            release.set()
+            await busy
+    
+    @pytest.mark.asyncio
+    async def test_open_serpapi_breaker_falls_back_immediately(self):
+        """Test that repeated SerpAPI outages trip the breaker and skip the network entirely"""
+        tool = WebSearchTool()
+        tool.serp_api_key = "test-key"
+        
+        async def outage(query, max_results):
+            raise asyncio.TimeoutError()
+        
+        with patch.object(tool, '_query_serpapi', side_effect=outage) as mock_query:
+            for i in range(config.BREAKER_MIN_CALLS):
+                results = await tool._search_web(f"query {i}", 2)
+                assert [{**r, "fallback": True} for r in tool._simulate_search_results(f"query {i}", 2)] == results
+            assert serpapi_breaker.state == CircuitBreaker.OPEN
+            
+            await tool._search_web("one more", 2)
+            assert mock_query.await_count == config.BREAKER_MIN_CALLS
+        
+        assert serpapi_breaker.metrics()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_results_skip_page_fetches(self):
+        """Test that simulated results from a SerpAPI outage are returned as snippets only"""
+        tool = WebSearchTool()
+        tool.serp_api_key = "test-key"
+        
+        with patch.object(tool, '_query_serpapi', side_effect=asyncio.TimeoutError()), \
+             patch.object(tool, '_extract_article_content') as mock_extract:
+            result = await tool.execute("black holes", max_results=2)
+        
+        assert mock_extract.await_count == 0
+        assert result["fallback"] is True
+        assert [article["content"] for article in result["articles"]] == ["", ""]
+
 class TestYouTubeTool:
     """Test cases for YouTubeTool"""
     
@@ -60,6 +421,18 @@ class TestYouTubeTool:
         assert result["query"] == "neural networks explained"
         assert len(result["videos"]) <= 2
     
+    @pytest.mark.asyncio
+    async def test_youtube_search_without_transcripts(self):
+        """Test that fetch_transcripts=False skips transcript fetches"""
+        tool = YouTubeTool()
+        
+        with patch.object(tool, '_get_video_transcript') as mock_transcript:
+            result = await tool.execute("neural networks explained", max_videos=2, fetch_transcripts=False)
+        
+        assert mock_transcript.await_count == 0
+        assert len(result["videos"]) == 2
+        assert all(video["transcript"] == "" and video["description"] for video in result["videos"])
+    
     @pytest.mark.asyncio
     async def test_youtube_transcript_extraction(self):
         """Test transcript extraction functionality"""
@@ -72,6 +445,69 @@ class TestYouTubeTool:
             transcript = await tool._get_video_transcript("test_video_id")
             assert transcript == "This is a sample transcript for testing."
 
+    @pytest.mark.asyncio
+    async def test_transcripts_fetched_concurrently_off_loop(self):
+        """Test that blocking transcript calls overlap in worker threads"""
+        tool = YouTubeTool()
+        
+        def blocking_transcript(video_id, languages):
+            time.sleep(0.2)
+            return [{"text": f"Transcript for {video_id}"}]
+        
+        with patch("tim_urban_agent.tools.youtube_tool.YouTubeTranscriptApi.get_transcript",
+                   side_effect=blocking_transcript, create=True):
+            start = time.perf_counter()
+            result = await tool.execute("black holes", max_videos=5)
+            elapsed = time.perf_counter() - start
+        
+        assert [video["transcript"] for video in result["videos"]] == [
+            f"Transcript for sim_vid_{i}" for i in range(5)
+        ]
+        assert elapsed < 0.6
+    
+    @pytest.mark.asyncio
+    async def test_transcript_timeout(self):
+        """Test that a hung transcript call is cut off by the per-call timeout"""
+        tool = YouTubeTool()
+        
+        def hung_transcript(video_id, languages):
+            time.sleep(0.5)
+            return [{"text": "too late"}]
+        
+        with patch("tim_urban_agent.tools.youtube_tool.YouTubeTranscriptApi.get_transcript",
+                   side_effect=hung_transcript, create=True), \
+             patch("tim_urban_agent.tools.youtube_tool.YOUTUBE_CALL_TIMEOUT", 0.05):
+            transcript = await tool._get_video_transcript("slow_video")
+        
+        assert transcript == "Transcript not available for video slow_video"
+
+    @pytest.mark.asyncio
+    async def test_timed_out_calls_keep_their_threads_bounded(self):
+        """Test that abandoned hung calls still count against the YouTube concurrency limit"""
+        tool = YouTubeTool()
+        running, peak = 0, 0
+        lock = threading.Lock()
+        
+        def hung_call():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.1)
+            with lock:
+                running -= 1
+        
+        with patch("tim_urban_agent.tools.youtube_tool.YOUTUBE_CONCURRENCY", 2), \
+             patch("tim_urban_agent.tools.youtube_tool.YOUTUBE_CALL_TIMEOUT", 0.02):
+            results = await asyncio.gather(
+                *(tool._run_blocking(hung_call) for _ in range(6)), return_exceptions=True
+            )
+            await asyncio.sleep(0.15)
+        
+        assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+        assert peak == 2
+        assert running == 0
+
 class TestImageGenerationTool:
     """Test cases for ImageGenerationTool"""
     
@@ -97,7 +533,7 @@ class TestImageGenerationTool:
             mock_response = Mock()
             mock_response.data = [Mock()]
             mock_response.data[0].b64_json = "fake_base64_image_data"
-            mock_client.images.generate.return_value = mock_response
+            mock_client.images.generate = AsyncMock(return_value=mock_response)
             
             result = await tool.execute("How the internet works", style="detailed")
             
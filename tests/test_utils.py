@@ -0,0 +1,695 @@
+"""
+Test cases for Tim Urban Agent utilities
+"""
+import pytest
+import asyncio
+import time
+
+from tim_urban_agent.utils.admission import AdmissionController, AdmissionRejected
+from tim_urban_agent.utils.article_extractor import ArticleExtractor
+from tim_urban_agent.utils.cache import DiskCache, TTLCache
+from tim_urban_agent.utils.checkpoint import CheckpointStore
+from tim_urban_agent.utils.circuit_breaker import CircuitBreaker, CircuitOpen
+from tim_urban_agent.utils.deadline import Deadline
+from tim_urban_agent.utils.executor import CPUExecutor
+from tim_urban_agent.utils.job_queue import JobQueue, JobWorkerPool
+from tim_urban_agent.utils.novelty import AdaptiveGate, NoveltyTracker
+from tim_urban_agent.utils.pipeline import Pipeline
+from tim_urban_agent.utils.rate_limiter import RateLimiter, parse_retry_after
+from tim_urban_agent.utils.research_aggregator import ResearchAggregator
+from tim_urban_agent.utils.retry import retry_async
+from tim_urban_agent.utils.singleflight import SingleFlight
+from tim_urban_agent.utils.text_processor import TextProcessor
+from tim_urban_agent.tools.image_generation_tool import ImageGenerationTool
+
+class TestAdmissionController:
+    """Test cases for AdmissionController"""
+    
+    @pytest.mark.asyncio
+    async def test_cap_fair_queueing_and_rejection(self):
+        """Test the concurrency cap, round-robin release across clients and fast rejection"""
+        admission = AdmissionController(max_concurrent=1, max_queue=4)
+        release = asyncio.Event()
+        order = []
+        
+        async def request(client_id, name):
+            async with admission.admit(client_id):
+                order.append(name)
+                await release.wait()
+        
+        running = asyncio.create_task(request("a", "a0"))
+        await asyncio.sleep(0)
+        # Client "a" floods the queue before "b" shows up
+        waiting = [asyncio.create_task(request("a", f"a{i}")) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.create_task(request("b", "b1")))
+        await asyncio.sleep(0.01)
+        
+        metrics = admission.metrics()
+        assert metrics["active"] == 1
+        assert metrics["queued_by_client"] == {"a": 3, "b": 1}
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit("c"):
+                pass
+        
+        release.set()
+        await asyncio.gather(running, *waiting)
+        
+        assert order == ["a0", "a1", "b1", "a2", "a3"]
+        metrics = admission.metrics()
+        assert (metrics["active"], metrics["queued"]) == (0, 0)
+        assert (metrics["admitted"], metrics["rejected"]) == (5, 1)
+        assert metrics["wait_seconds"]["max"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that a caller cancelled while waiting frees its queue slot"""
+        admission = AdmissionController(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        
+        async def hold():
+            async with admission.admit():
+                await release.wait()
+        
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        
+        assert admission.metrics()["queued"] == 0
+        release.set()
+        await holder
+        assert admission.metrics()["active"] == 0
+
+class TestArticleExtractor:
+    """Test cases for ArticleExtractor"""
+    
+    def test_extracts_main_content_within_budget(self):
+        """Test selector-based extraction, script removal and the character budget"""
+        extractor = ArticleExtractor(max_chars=50, parser="html.parser")
+        html = (
+            "<html><body><nav>Menu</nav><article><script>var x;</script>"
+            + "<p>Paragraph text.</p>" * 20
+            + "</article></body></html>"
+        )
+        
+        content = extractor.extract(html)
+        
+        assert content.startswith("Paragraph text.")
+        assert "Menu" not in content
+        assert "var x" not in content
+        assert len(content) == 50
+    
+    def test_is_html(self):
+        """Test the Content-Type gate"""
+        assert ArticleExtractor.is_html("text/html; charset=utf-8")
+        assert ArticleExtractor.is_html("application/xhtml+xml")
+        assert ArticleExtractor.is_html("")
+        assert not ArticleExtractor.is_html("application/pdf")
+
+class TestTTLCache:
+    """Test cases for TTLCache"""
+    
+    def test_lru_and_expiry(self):
+        """Test capacity-based LRU eviction and TTL expiry"""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats["evictions"] == 1
+        
+        cache.ttl = 0
+        assert cache.get("c") is None
+
+class TestDiskCache:
+    """Test cases for DiskCache"""
+    
+    def test_get_set_and_stats(self, tmp_path):
+        """Test basic storage, hit/miss counting and expiry"""
+        cache = DiskCache(str(tmp_path), ttl=60, max_bytes=1024 * 1024)
+        
+        assert cache.get("https://example.com") is None
+        cache.set("https://example.com", {"content": "hello"})
+        assert cache.get("https://example.com") == {"content": "hello"}
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+        
+        cache.ttl = 0
+        entry = cache.get_entry("https://example.com")
+        assert entry["fresh"] is False
+        assert entry["value"] == {"content": "hello"}
+        assert cache.get("https://example.com") is None
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries are evicted first"""
+        cache = DiskCache(str(tmp_path), ttl=60, max_bytes=400)
+        
+        cache.set("a", "x" * 100)
+        cache.set("b", "x" * 100)
+        # Make "a" the most recently used entry
+        time.sleep(0.01)
+        cache.get("a")
+        cache.set("c", "x" * 100)
+        
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats["evictions"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_to_one_key(self, tmp_path):
+        """Test that threads writing the same key at once don't trip over a shared temp file"""
+        cache = DiskCache(str(tmp_path), ttl=60, max_bytes=1024 * 1024)
+        
+        await asyncio.gather(*(
+            asyncio.to_thread(lambda i=i: [cache.set("page", {"n": i}) for _ in range(20)])
+            for i in range(4)
+        ))
+        
+        assert cache.get("page")["n"] in range(4)
+        assert list(tmp_path.glob("*.tmp")) == []
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker"""
+    
+    @pytest.mark.asyncio
+    async def test_open_half_open_and_close(self):
+        """Test tripping on the failure rate, failing fast, and recovering through a probe"""
+        breaker = CircuitBreaker("test", failure_threshold=0.5, min_calls=4, window=10, reset_timeout=0.05)
+        
+        async def ok():
+            return "ok"
+        
+        async def down():
+            raise ConnectionError("down")
+        
+        async def bad_request():
+            raise ValueError("bad input")
+        
+        await breaker.call(ok)
+        with pytest.raises(ValueError):
+            # Errors outside failure_types don't count as an outage
+            await breaker.call(bad_request, failure_types=(ConnectionError,))
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(down, failure_types=(ConnectionError,))
+        assert breaker.state == CircuitBreaker.OPEN
+        
+        calls = 0
+        async def counted():
+            nonlocal calls
+            calls += 1
+        
+        with pytest.raises(CircuitOpen):
+            await breaker.call(counted)
+        assert calls == 0
+        
+        # After the reset timeout one probe goes through; a failure reopens, a success closes
+        await asyncio.sleep(0.06)
+        with pytest.raises(ConnectionError):
+            await breaker.call(down)
+        assert breaker.state == CircuitBreaker.OPEN
+        await asyncio.sleep(0.06)
+        assert await breaker.call(ok) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+        
+        metrics = breaker.metrics()
+        assert (metrics["opened"], metrics["rejected"]) == (2, 1)
+        assert metrics["window_calls"] == 0
+
+class TestDeadline:
+    """Test cases for Deadline"""
+    
+    def test_unbounded(self):
+        """Test that a deadline without a budget never expires"""
+        deadline = Deadline()
+        
+        assert not deadline.bounded
+        assert not deadline.expired()
+        assert deadline.remaining() == float("inf")
+        assert deadline.timeout(0.5) is None
+        assert deadline.timeout(0.5, cap=10) == 10
+    
+    def test_budget(self):
+        """Test remaining time, timeout shares and expiry"""
+        deadline = Deadline(0.05)
+        
+        assert deadline.bounded
+        assert 0.04 < deadline.remaining() <= 0.05
+        assert deadline.timeout(0.5) <= 0.025
+        assert deadline.timeout(cap=0.01) == 0.01
+        
+        time.sleep(0.06)
+        assert deadline.expired()
+        assert deadline.remaining() == 0.0
+        assert deadline.timeout() == 0.0
+
+class TestCPUExecutor:
+    """Test cases for CPUExecutor"""
+    
+    @pytest.mark.asyncio
+    async def test_thread_pool_records_stage_timings(self):
+        """Test that stages run on the pool and are timed"""
+        executor = CPUExecutor(kind="thread", max_workers=2)
+        try:
+            image_data = await executor.run("cartoon_render", ImageGenerationTool._render_simple_cartoon, "Gravity")
+            await executor.run("cartoon_render", ImageGenerationTool._render_placeholder_cartoon, "Gravity")
+        finally:
+            executor.shutdown()
+        
+        assert image_data
+        timings = executor.get_timings()
+        assert timings["cartoon_render"]["calls"] == 2
+        assert timings["cartoon_render"]["max_seconds"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_process_pool_runs_analysis(self):
+        """Test that the analysis stage is picklable and runs in worker processes"""
+        executor = CPUExecutor(kind="process", max_workers=1)
+        research_data = {
+            "primary_web": {"articles": [{"content": "Black holes are an important topic in physics.", "url": "https://example.edu/bh"}]},
+            "youtube": {"videos": []},
+            "related": []
+        }
+        try:
+            analysis = await executor.run("research_analysis", ResearchAggregator()._analyze, research_data, "black holes")
+        finally:
+            executor.shutdown()
+        
+        assert analysis["topic"] == "black holes"
+        assert analysis["source_quality"]["has_academic"] is True
+
+class TestRateLimiter:
+    """Test cases for RateLimiter"""
+    
+    @pytest.mark.asyncio
+    async def test_request_and_token_budgets(self):
+        """Test that callers queue until both budgets cover their request"""
+        # 600/min refills 10 units per second
+        limiter = RateLimiter("test", requests_per_minute=600)
+        limiter.requests.tokens = 1
+        
+        start = time.perf_counter()
+        await asyncio.gather(limiter.acquire(), limiter.acquire())
+        assert 0.08 <= time.perf_counter() - start < 0.3
+        assert limiter.metrics()["delayed"] == 1
+        
+        # An estimate waits for the token budget; actual usage is settled afterwards
+        limiter = RateLimiter("test", requests_per_minute=0, tokens_per_minute=600)
+        limiter.tokens.tokens = 0
+        start = time.perf_counter()
+        await limiter.acquire(tokens=1)
+        assert 0.08 <= time.perf_counter() - start < 0.3
+        limiter.settle(estimated=1, actual=5)
+        assert limiter.tokens.tokens == pytest.approx(-4, abs=0.5)
+    
+    @pytest.mark.asyncio
+    async def test_penalize_pauses_callers(self):
+        """Test that a rate-limit response pauses everyone for Retry-After"""
+        limiter = RateLimiter("test", requests_per_minute=0)
+        limiter.penalize(0.1)
+        
+        start = time.perf_counter()
+        await limiter.acquire()
+        assert time.perf_counter() - start >= 0.1
+        assert limiter.stats["rate_limited"] == 1
+    
+    def test_parse_retry_after(self):
+        """Test delta-seconds and HTTP-date Retry-After values"""
+        assert parse_retry_after("2.5") == 2.5
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+class TestRetryAsync:
+    """Test cases for retry_async"""
+    
+    @pytest.mark.asyncio
+    async def test_retries_then_succeeds(self):
+        """Test that retryable errors are retried up to the attempt limit"""
+        calls = []
+        
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("boom")
+            return "ok"
+        
+        result = await retry_async(flaky, attempts=3, base_delay=0.001, max_delay=0.01)
+        assert result == "ok"
+        assert len(calls) == 3
+    
+    @pytest.mark.asyncio
+    async def test_non_retryable_and_timeout(self):
+        """Test that other errors propagate immediately and timeouts are retried"""
+        calls = []
+        
+        async def bad_request():
+            calls.append(1)
+            raise ValueError("bad request")
+        
+        with pytest.raises(ValueError):
+            await retry_async(bad_request, attempts=3, base_delay=0.001, max_delay=0.01, retry_on=(ConnectionError,))
+        assert len(calls) == 1
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await retry_async(
+                lambda: asyncio.sleep(1), attempts=2, base_delay=0.001, max_delay=0.01, timeout=0.01
+            )
+
+class TestPipeline:
+    """Test cases for Pipeline"""
+    
+    @pytest.mark.asyncio
+    async def test_independent_phases_overlap(self):
+        """Test that phases start as soon as their dependencies finish"""
+        async def phase(value, delay):
+            await asyncio.sleep(delay)
+            return value
+        
+        pipeline = Pipeline()
+        pipeline.add_phase("a", lambda: phase(1, 0.05))
+        pipeline.add_phase("fast", lambda a: phase(a + 1, 0.05), depends_on=["a"])
+        pipeline.add_phase("slow", lambda a: phase(a + 2, 0.15), depends_on=["a"])
+        pipeline.add_phase("join", lambda fast, a: phase(fast + a, 0.0), depends_on=["fast", "a"])
+        
+        start = time.perf_counter()
+        results = await pipeline.run()
+        
+        assert results == {"a": 1, "fast": 2, "slow": 3, "join": 3}
+        assert time.perf_counter() - start < 0.3
+        assert pipeline.critical_path() == ["a", "slow"]
+    
+    @pytest.mark.asyncio
+    async def test_failure_lets_independent_phases_finish(self):
+        """Test that a failing phase propagates once independent phases have finished"""
+        finished = []
+        
+        async def on_complete(name, result):
+            finished.append(name)
+        
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "done"
+        
+        async def fail():
+            raise RuntimeError("boom")
+        
+        async def after_fail(fail):
+            return "never"
+        
+        pipeline = Pipeline(on_phase_complete=on_complete)
+        pipeline.add_phase("slow", slow)
+        pipeline.add_phase("fail", fail)
+        pipeline.add_phase("after_fail", after_fail, depends_on=["fail"])
+        
+        with pytest.raises(RuntimeError):
+            await pipeline.run()
+        assert finished == ["slow"]
+    
+    @pytest.mark.asyncio
+    async def test_cancelling_run_cancels_phases(self):
+        """Test that cancelling the run cancels its running phases"""
+        cancelled = asyncio.Event()
+        
+        async def hang():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        pipeline = Pipeline()
+        pipeline.add_phase("hang", hang)
+        run = asyncio.create_task(pipeline.run())
+        await asyncio.sleep(0.01)
+        run.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        assert cancelled.is_set()
+        
+        with pytest.raises(ValueError):
+            pipeline.add_phase("orphan", hang, depends_on=["missing"])
+
+    @pytest.mark.asyncio
+    async def test_resume_from_completed_phases(self):
+        """Test that completed phases are reused and only the rest run and get reported"""
+        saved = {}
+        
+        async def on_phase_complete(name, result):
+            saved[name] = result
+        
+        async def phase(value):
+            return value
+        
+        pipeline = Pipeline(on_phase_complete=on_phase_complete)
+        pipeline.add_phase("a", lambda: phase(1))
+        pipeline.add_phase("b", lambda a: phase(a + 1), depends_on=["a"])
+        
+        results = await pipeline.run({"a": 10})
+        
+        assert results == {"a": 10, "b": 11}
+        assert pipeline.resumed == ["a"]
+        assert saved == {"b": 11}
+        assert pipeline.critical_path() == ["b"]
+
+class TestCheckpointStore:
+    """Test cases for CheckpointStore"""
+    
+    def test_save_load_and_clear(self, tmp_path):
+        """Test the per-job phase round trip"""
+        store = CheckpointStore(str(tmp_path))
+        store.save("job-1", "research", {"sources": []})
+        store.save("job-1", "analysis", {"summary": "x"})
+        store.save("job-2", "research", {"sources": [1]})
+        
+        assert store.load("job-1") == {"research": {"sources": []}, "analysis": {"summary": "x"}}
+        store.clear("job-1")
+        assert store.load("job-1") == {}
+        assert store.load("job-2") == {"research": {"sources": [1]}}
+        
+        with pytest.raises(ValueError):
+            store.load("../escape")
+    
+    def test_prune(self, tmp_path):
+        """Test that abandoned jobs are pruned by age"""
+        store = CheckpointStore(str(tmp_path))
+        store.save("old", "research", {})
+        time.sleep(0.05)
+        store.save("new", "research", {})
+        
+        store.prune(0.02)
+        
+        assert store.load("old") == {}
+        assert store.load("new") == {"research": {}}
+
+class TestJobQueue:
+    """Test cases for JobQueue and JobWorkerPool"""
+    
+    def test_lifecycle_and_recovery(self, tmp_path):
+        """Test FIFO claiming, status reporting and requeueing of interrupted jobs"""
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+        first = queue.submit({"topic": "first"})
+        second = queue.submit({"topic": "second"})
+        
+        assert queue.claim() == (first, {"topic": "first"})
+        queue.set_phase(first, "research")
+        status = queue.status(first)
+        assert status["status"] == "running"
+        assert status["phase"] == "research"
+        assert queue.result(first) is None
+        
+        queue.complete(first, {"blog_post": "done"})
+        assert queue.status(first)["status"] == "completed"
+        assert queue.result(first) == {"blog_post": "done"}
+        
+        # A restart puts running jobs back in the queue; a new instance sees them
+        assert queue.claim()[0] == second
+        reopened = JobQueue(str(tmp_path / "jobs.sqlite3"))
+        assert reopened.requeue_running() == [second]
+        assert reopened.claim()[0] == second
+        reopened.fail(second, "boom")
+        assert reopened.status(second)["error"] == "boom"
+        
+        assert reopened.claim() is None
+        assert reopened.status("missing") is None
+    
+    @pytest.mark.asyncio
+    async def test_workers_drain_queue(self, tmp_path):
+        """Test that workers run queued jobs, record progress and isolate failures"""
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+        phases_seen = []
+        
+        class FakeAgent:
+            async def research_topic(self, topic, job_id, on_progress):
+                await on_progress("research", "started")
+                phases_seen.append(queue.status(job_id)["phase"])
+                await asyncio.sleep(0.1)
+                await on_progress("research", "completed")
+                if topic == "broken":
+                    raise RuntimeError("boom")
+                return {"blog_post": f"post about {topic}", "job_id": job_id}
+        
+        workers = JobWorkerPool(queue, FakeAgent(), workers=2, poll_interval=0.01)
+        workers.start()
+        ok, broken = queue.submit({"topic": "ok"}), queue.submit({"topic": "broken"})
+        workers.notify()
+        
+        start = time.perf_counter()
+        while queue.status(broken)["status"] != "failed" or queue.status(ok)["status"] != "completed":
+            assert time.perf_counter() - start < 2
+            await asyncio.sleep(0.02)
+        await workers.stop()
+        
+        assert phases_seen == ["research", "research"]
+        assert queue.result(ok) == {"blog_post": "post about ok", "job_id": ok}
+        assert queue.status(broken)["error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_worker_survives_unstorable_result(self, tmp_path):
+        """Test that a job whose result can't be stored fails without killing its worker"""
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+        
+        class FakeAgent:
+            async def research_topic(self, topic, job_id, on_progress):
+                if topic == "unstorable":
+                    return {"blog_post": object()}
+                return {"blog_post": f"post about {topic}"}
+        
+        workers = JobWorkerPool(queue, FakeAgent(), workers=1, poll_interval=0.01)
+        workers.start()
+        bad, ok = queue.submit({"topic": "unstorable"}), queue.submit({"topic": "ok"})
+        workers.notify()
+        
+        start = time.perf_counter()
+        while queue.status(ok)["status"] != "completed":
+            assert time.perf_counter() - start < 2
+            await asyncio.sleep(0.02)
+        await workers.stop()
+        
+        assert queue.status(bad)["status"] == "failed"
+        assert queue.result(ok) == {"blog_post": "post about ok"}
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run once and all get the result"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flight.stats == {"executed": 1, "coalesced": 4}
+        assert flight.in_flight() == 0
+        
+        # Once finished, the next call runs again
+        await flight.do("key", work)
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancellation(self):
+        """Test that one cancelled caller detaches and the last one cancels the work"""
+        flight = SingleFlight()
+        work_cancelled = asyncio.Event()
+        
+        async def work():
+            try:
+                await asyncio.sleep(0.1)
+                return "done"
+            except asyncio.CancelledError:
+                work_cancelled.set()
+                raise
+        
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        
+        first.cancel()
+        assert await second == "done"
+        assert not work_cancelled.is_set()
+        
+        lonely = asyncio.create_task(flight.do("other", work))
+        await asyncio.sleep(0.01)
+        lonely.cancel()
+        await asyncio.sleep(0.01)
+        assert work_cancelled.is_set()
+        assert flight.in_flight() == 0
+
+class TestAdaptiveGate:
+    """Test cases for NoveltyTracker and AdaptiveGate"""
+    
+    def test_novelty_scores(self):
+        """Test that novelty is the share of shingles the corpus hasn't seen"""
+        tracker = NoveltyTracker()
+        
+        assert tracker.add("black holes bend light around them") == 1.0
+        assert tracker.score("Black holes bend light") == 0.0
+        assert tracker.score("black holes bend time instead") == pytest.approx(2 / 3)
+        assert tracker.score("") == 0.0
+    
+    def test_closes_when_recent_novelty_is_low(self):
+        """Test that the gate closes once the recent mean novelty falls below the threshold"""
+        gate = AdaptiveGate(novelty_threshold=0.5, window=2, min_documents=2, time_budget=0, byte_budget=0)
+        
+        gate.record("one two three four")
+        gate.record("")
+        gate.record("one two three four five")
+        assert gate.is_open()
+        
+        gate.record("one two three four five")
+        assert not gate.is_open()
+        assert gate.metrics()["stop_reason"] == "novelty"
+        assert gate.metrics()["documents"] == 3
+    
+    def test_closes_when_budget_is_spent(self):
+        """Test the byte and time budgets"""
+        by_bytes = AdaptiveGate(time_budget=0, byte_budget=10)
+        by_bytes.record("more than ten bytes of text")
+        assert not by_bytes.is_open()
+        assert by_bytes.stop_reason == "bytes"
+        
+        by_time = AdaptiveGate(time_budget=0.01, byte_budget=0)
+        assert by_time.is_open()
+        time.sleep(0.02)
+        assert not by_time.is_open()
+        assert by_time.stop_reason == "time"
+
+class TestCanonicalizeUrl:
+    """Test cases for TextProcessor.canonicalize_url"""
+    
+    def test_cosmetic_variants_are_equal(self):
+        """Test that scheme, host case, www, tracking params, slashes and fragments are folded"""
+        canonical = TextProcessor.canonicalize_url("https://example.com/post?id=2&page=1")
+        variants = [
+            "http://example.com/post?id=2&page=1",
+            "https://WWW.Example.com/post/?page=1&id=2",
+            "https://example.com:443/post?id=2&utm_source=news&page=1&fbclid=abc#comments",
+        ]
+        
+        for variant in variants:
+            assert TextProcessor.canonicalize_url(variant) == canonical
+    
+    def test_distinct_pages_stay_distinct(self):
+        """Test that meaningful path and query differences are kept"""
+        assert TextProcessor.canonicalize_url("https://example.com/a") != TextProcessor.canonicalize_url("https://example.com/b")
+        assert TextProcessor.canonicalize_url("https://youtube.com/watch?v=1") != TextProcessor.canonicalize_url("https://youtube.com/watch?v=2")
+        assert TextProcessor.canonicalize_url(" mailto:someone@example.com ") == "mailto:someone@example.com"
+
+if __name__ == "__main__":
+    pytest.main([__file__])